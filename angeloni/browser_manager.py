@@ -1,7 +1,10 @@
+import asyncio
 import logging
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, BrowserContext
+from typing import Any, Dict, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
 from config_loader import ScraperConfig
+from utils.resource_tracker import ResourceTracker
+from utils.session_cache import SessionCache
 
 logger = logging.getLogger(__name__)
 
@@ -12,39 +15,93 @@ class BrowserManager:
 
     def __init__(self, config: ScraperConfig):
         self.config = config
+        self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
+        self.session_cache = SessionCache("angeloni", config.session)
+        self.resources = ResourceTracker("angeloni")
+        self._init_lock = asyncio.Lock()
     
     async def initialize(self):
         """
         Initialize browser and context if not already done.
+        Safe to call from concurrent searches sharing this manager.
         """
-        if not self.browser:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(
-                headless=True,
-                args=self.config.browser_args
-            )
-            self.context = await self.browser.new_context(
-                viewport=self.config.viewport,
-                user_agent=self.config.user_agent
-            )
+        async with self._init_lock:
+            if self.browser and not self.browser.is_connected():
+                logger.warning("Browser disconnected, relaunching")
+                await self.close()
+            if self.browser:
+                return
+            # Keep nothing half-started: a failed launch stops what it already started
+            playwright = browser = None
+            try:
+                playwright = await async_playwright().start()
+                browser = await playwright.chromium.launch(
+                    headless=True,
+                    args=self.config.browser_args
+                )
+                context = await browser.new_context(
+                    viewport=self.config.viewport,
+                    user_agent=self.config.user_agent,
+                    storage_state=self.session_cache.storage_state()
+                )
+                await context.route("**/*", self.session_cache.handle_route)
+            except Exception:
+                self.resources.launch_failures += 1
+                await self._shutdown(playwright, browser)
+                raise
+            self.playwright, self.browser, self.context = playwright, browser, context
+            self.resources.browser_launches += 1
             logger.info("Browser initialized")
     
     async def new_page(self):
         """
         Create a new page in the current context.
         """
-        if not self.context:
+        if not self.context or not self.browser.is_connected():
             await self.initialize()
-        return await self.context.new_page()
+        return self.resources.page_opened(await self.context.new_page())
+    
+    async def close_page(self, page):
+        """
+        Close a page created with new_page, releasing its element handles.
+        """
+        await self.resources.close_page(page)
+    
+    def resource_stats(self) -> Dict[str, Any]:
+        """
+        Return open pages and live element handles of the browser context.
+        """
+        return self.resources.stats(self.context)
+    
+    async def save_session(self):
+        """
+        Persist cookies and local storage when the stored state is missing or expired.
+        """
+        if self.context and self.session_cache.needs_refresh():
+            await self.session_cache.save_storage_state(self.context)
+    
+    @staticmethod
+    async def _shutdown(playwright, browser):
+        try:
+            if browser:
+                await browser.close()
+        except Exception as e:
+            logger.warning(f"Could not close browser: {e}")
+        finally:
+            # Stops the driver process even when the browser is already gone
+            if playwright:
+                await playwright.stop()
     
     async def close(self):
         """
-        Close browser and clean up resources.
+        Close browser, stop Playwright and clean up resources.
         """
-        if self.browser:
-            await self.browser.close()
-            self.browser = None
-            self.context = None
-            logger.info("Browser closed")
\ No newline at end of file
+        playwright, browser = self.playwright, self.browser
+        self.browser = None
+        self.context = None
+        self.playwright = None
+        if playwright or browser:
+            await self._shutdown(playwright, browser)
+            logger.info("Browser closed")
@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Optional, Sequence
 from playwright.async_api import Page, ElementHandle
+from utils.resource_tracker import count_elements
 
 class ElementUtils:
     """
@@ -7,40 +8,63 @@ class ElementUtils:
     """
     
     @staticmethod
-    async def find_element(page: Page, selectors: List[str], timeout: int = 3000) -> Optional[ElementHandle]:
+    async def find_element(page: Page, selectors: Sequence[str], timeout: int,
+                           combined_selector: Optional[str] = None) -> Optional[ElementHandle]:
         """
         Find the first matching element from a list of selectors.
+        Waits once for any of them (using the precompiled combined selector when
+        given), then returns the match of the highest-priority selector.
         """
+        try:
+            # Waits through a locator, which (unlike wait_for_selector) creates no element handle
+            await page.locator(combined_selector or ", ".join(selectors)).first.wait_for(timeout=timeout)
+        except Exception:
+            return None
+        
         for selector in selectors:
-            try:
-                return await page.wait_for_selector(selector, timeout=timeout)
-            except:
-                continue
+            element = await page.query_selector(selector)
+            if element:
+                return element
         return None
     
     @staticmethod
-    async def extract_text(element: ElementHandle, selectors: List[str]) -> Optional[str]:
+    async def extract_text(element: ElementHandle, selectors: Sequence[str]) -> Optional[str]:
         """
-        Extract text content from an element using multiple selector strategies.
+        Extract text content from an element using multiple selector strategies,
+        tried in priority order.
         """
-        if isinstance(selectors, str):
-            selectors = [selectors]
-            
         for selector in selectors:
             el = await element.query_selector(selector)
             if el:
-                text = await el.text_content()
+                try:
+                    text = await el.text_content()
+                finally:
+                    await el.dispose()
                 if text and text.strip():
                     return text.strip()
         return None
     
     @staticmethod
-    async def find_elements(page: Page, selectors: List[str]) -> List[ElementHandle]:
+    async def text_content(element: ElementHandle, selector: str) -> Optional[str]:
         """
-        Find all matching elements from a list of selectors.
+        Return the raw text content of the first match of a selector inside an element,
+        or None if nothing matches. The match's handle is released right away.
+        """
+        el = await element.query_selector(selector)
+        if not el:
+            return None
+        try:
+            return await el.text_content()
+        finally:
+            await el.dispose()
+    
+    @staticmethod
+    async def find_selector(page: Page, selectors: Sequence[str]) -> Optional[str]:
+        """
+        Return the first selector from a list that matches any element,
+        without holding handles to the matches.
         """
         for selector in selectors:
-            elements = await page.query_selector_all(selector)
-            if elements:
-                return elements
-        return []
\ No newline at end of file
+            if await count_elements(page, selector):
+                return selector
+        return None
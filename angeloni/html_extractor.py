@@ -0,0 +1,70 @@
+import logging
+from typing import Dict, List, Optional
+from config_loader import ScraperSettings
+from utils.html_parser import parse_html, extract_text, find_elements, text_content
+
+logger = logging.getLogger(__name__)
+
+class HtmlProductExtractor:
+    """
+    Extracts products from an Angeloni results page's HTML without a browser.
+    Uses the same selectors and rules as ProductExtractor.extract_all_products,
+    so it can parse a live page's content in one pass or re-extract saved snapshots.
+    """
+    def __init__(self, config: ScraperSettings):
+        self.config = config
+    
+    def extract_product_data(self, product) -> Dict[str, str]:
+        """
+        Extract product information from a product card node.
+        """
+        name = extract_text(product, self.config.selectors["name"])
+        
+        # Build the full price from its integer, decimal and currency parts first
+        price = "Price not found"
+        currency_integer = product.css_first('.vtex-product-price-1-x-currencyInteger')
+        if currency_integer is not None:
+            integer_text = text_content(currency_integer)
+            if integer_text:
+                integer_text = integer_text.strip()
+                decimal_part = product.css_first('.vtex-product-price-1-x-currencyFraction')
+                decimal_content = text_content(decimal_part) if decimal_part is not None else ""
+                decimal_text = f",{decimal_content.strip()}" if decimal_content else ""
+                
+                currency_symbol = product.css_first('.vtex-product-price-1-x-currencyContainer')
+                symbol_text = text_content(currency_symbol) if currency_symbol is not None else ""
+                if symbol_text:
+                    price = f"{symbol_text.strip()} {integer_text}{decimal_text}"
+                else:
+                    price = f"R$ {integer_text}{decimal_text}"
+        
+        # If price construction failed, fall back to the configured price selectors
+        if price == "Price not found":
+            price = extract_text(product, self.config.selectors["price"])
+        
+        unit_price = extract_text(product, self.config.selectors["unit_price"])
+        
+        return {
+            "name": name or "Name not found",
+            "price": price or "Price not found",
+            "unit_price": unit_price if unit_price and unit_price != price else ""
+        }
+    
+    def extract_all_products(self, html: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Extract data from all product cards in the HTML, or only the first `limit`.
+        """
+        products = find_elements(parse_html(html), self.config.selectors["product_items"])
+        if limit:
+            products = products[:limit]
+        
+        product_list = []
+        
+        for product in products:
+            try:
+                product_list.append(self.extract_product_data(product))
+            except Exception as e:
+                logger.warning(f"Error parsing product: {e}")
+                continue
+        
+        return product_list
@@ -1,8 +1,10 @@
 import asyncio
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from playwright.async_api import Page, ElementHandle
-from config_loader import ScraperConfig
+from config_loader import ScraperSettings
+from utils.ranking import relevant_ratio
+from utils.resource_tracker import ResourceTracker, count_elements
 from .element_utils import ElementUtils
 
 logger = logging.getLogger(__name__)
@@ -11,67 +13,138 @@ class ProductExtractor:
     """
     Handles product search and data extraction for Angeloni.
     """
-    def __init__(self, config: ScraperConfig):
+    def __init__(self, config: ScraperSettings, resources: Optional[ResourceTracker] = None):
         self.config = config
+        self.resources = resources or ResourceTracker("angeloni")
     
     async def search_products(self, page: Page, search_term: str):
+        """
+        Open the search results for a term, navigating straight to the results
+        URL when a template is configured and typing the search otherwise.
+        """
+        search_url = self.config.search_url(search_term)
+        if search_url:
+            try:
+                await self.open_search_url(page, search_url)
+                return
+            except Exception as e:
+                logger.warning(f"Direct search navigation failed, falling back to typed search: {e}")
+        
+        await self.type_search(page, search_term)
+    
+    async def open_search_url(self, page: Page, search_url: str):
+        """
+        Navigate directly to a search results URL.
+        """
+        await page.goto(search_url, timeout=self.config.timeouts["page_load"])
+        
+        product = self.resources.track(await ElementUtils.find_element(
+            page,
+            self.config.selectors["product_items"],
+            self.config.timeouts["element_wait"],
+            self.config.combined_selectors["product_items"]
+        ))
+        
+        if not product:
+            raise Exception(f"No products rendered at {search_url}")
+        await self.resources.dispose([product])
+        
+        await asyncio.sleep(2)
+    
+    async def type_search(self, page: Page, search_term: str):
         """
         Navigate to site and perform a product search.
         """
         await page.goto(self.config.base_url, timeout=self.config.timeouts["page_load"])
         await asyncio.sleep(3)
         
-        search_input = await ElementUtils.find_element(
+        search_input = self.resources.track(await ElementUtils.find_element(
             page, 
-            self.config.selectors["search_input"], 
-            self.config.timeouts["element_wait"]
-        )
+            self.config.selectors["search_input"],
+            self.config.timeouts["element_wait"],
+            self.config.combined_selectors["search_input"]
+        ))
         
         if not search_input:
             raise Exception("Could not find search input on Angeloni website")
         
-        await search_input.click()
-        await search_input.fill(search_term)
+        try:
+            await search_input.click()
+            await search_input.fill(search_term)
+        finally:
+            await self.resources.dispose([search_input])
         await asyncio.sleep(0.5)
         await page.keyboard.press('Enter')
         
         await asyncio.sleep(5)
     
-    async def load_all_products(self, page: Page):
+    async def load_all_products(self, page: Page, search_term: Optional[str] = None,
+                                limit: Optional[int] = None, max_pages: Optional[int] = None) -> Dict[str, Any]:
         """
-        Load all products by clicking 'Mostrar mais' until no more products.
+        Load products by clicking 'Mostrar mais' until no more products, or until enough were found.
+        
+        Loading stops once `limit` products are on the page or `max_pages` pages were
+        loaded (pagination.max_pages by default). Without a limit, it also stops when
+        less than pagination.min_relevant_ratio of a newly loaded page matches the search.
+        Products are counted without holding handles to them.
+        
+        Returns:
+            Dictionary with the number of pages loaded, whether the results ran out
+            and the number of products on the first page
         """
+        max_pages = max_pages or self.config.pagination.get("max_pages", 10)
+        min_relevant_ratio = self.config.pagination.get("min_relevant_ratio", 0)
         previous_count = 0
-        max_iterations = 10
-        iteration_count = 0
+        pages_loaded = 0
+        first_page_products = 0
+        exhausted = False
         
-        while iteration_count < max_iterations:
-            iteration_count += 1
-            
-            products = await ElementUtils.find_elements(
-                page, 
-                self.config.selectors["product_items"]
-            )
-            
-            current_count = len(products)
+        while True:
+            product_items = await ElementUtils.find_selector(page, self.config.selectors["product_items"])
+            current_count = await count_elements(page, product_items) if product_items else 0
             
             if current_count == previous_count:
+                exhausted = True
                 break
-                
+            
+            pages_loaded += 1
+            if pages_loaded == 1:
+                first_page_products = current_count
+            if limit and current_count >= limit:
+                break
+            if pages_loaded >= max_pages:
+                break
+            if not limit and search_term and previous_count and min_relevant_ratio:
+                names = await self.resources.map_elements(
+                    page, product_items,
+                    lambda product: ElementUtils.extract_text(product, self.config.selectors["name"]),
+                    start=previous_count
+                )
+                if relevant_ratio(names, search_term) < min_relevant_ratio:
+                    logger.info(f"Stopping after {pages_loaded} pages, new products no longer match '{search_term}'")
+                    break
+            
             previous_count = current_count
             
-            load_button = await ElementUtils.find_element(
-                page, 
-                self.config.selectors["load_more"], 
-                self.config.timeouts["load_more"]
-            )
+            load_button = self.resources.track(await ElementUtils.find_element(
+                page,
+                self.config.selectors["load_more"],
+                self.config.timeouts["load_more"],
+                self.config.combined_selectors["load_more"]
+            ))
             
             if not load_button:
+                exhausted = True
                 break
-                
-            await load_button.scroll_into_view_if_needed()
-            await load_button.click()
+            
+            try:
+                await load_button.scroll_into_view_if_needed()
+                await load_button.click()
+            finally:
+                await self.resources.dispose([load_button])
             await asyncio.sleep(2)
+        
+        return {"pages_loaded": pages_loaded, "exhausted": exhausted, "first_page_products": first_page_products}
     
     async def extract_product_data(self, product: ElementHandle) -> Dict[str, str]:
         """
@@ -83,30 +156,20 @@ class ProductExtractor:
         price = "Price not found"
         
         # Try to find price components and construct the full price
-        currency_integer = await product.query_selector('.vtex-product-price-1-x-currencyInteger')
-        if currency_integer:
-            integer_text = await currency_integer.text_content()
-            if integer_text:
-                integer_text = integer_text.strip()
-                
-                # Look for decimal part
-                decimal_part = await product.query_selector('.vtex-product-price-1-x-currencyFraction')
-                decimal_text = ""
-                if decimal_part:
-                    decimal_content = await decimal_part.text_content()
-                    if decimal_content:
-                        decimal_text = f",{decimal_content.strip()}"
-                
-                # Look for currency symbol
-                currency_symbol = await product.query_selector('.vtex-product-price-1-x-currencyContainer')
-                if currency_symbol:
-                    symbol_text = await currency_symbol.text_content()
-                    if symbol_text:
-                        price = f"{symbol_text.strip()} {integer_text}{decimal_text}"
-                    else:
-                        price = f"R$ {integer_text}{decimal_text}"
-                else:
-                    price = f"R$ {integer_text}{decimal_text}"
+        integer_text = await ElementUtils.text_content(product, '.vtex-product-price-1-x-currencyInteger')
+        if integer_text:
+            integer_text = integer_text.strip()
+            
+            # Look for decimal part
+            decimal_content = await ElementUtils.text_content(product, '.vtex-product-price-1-x-currencyFraction')
+            decimal_text = f",{decimal_content.strip()}" if decimal_content else ""
+            
+            # Look for currency symbol
+            symbol_text = await ElementUtils.text_content(product, '.vtex-product-price-1-x-currencyContainer')
+            if symbol_text:
+                price = f"{symbol_text.strip()} {integer_text}{decimal_text}"
+            else:
+                price = f"R$ {integer_text}{decimal_text}"
         
         # If price construction failed, fall back to the original selector approach
         if price == "Price not found":
@@ -120,23 +183,22 @@ class ProductExtractor:
             "unit_price": unit_price if unit_price and unit_price != price else ""
         }
     
-    async def extract_all_products(self, page: Page) -> List[Dict[str, str]]:
+    async def extract_all_products(self, page: Page, limit: Optional[int] = None) -> List[Dict[str, str]]:
         """
-        Extract data from all product elements on the page.
+        Extract data from all product elements on the page, or only the first `limit`.
+        Product elements are visited in chunks, each chunk's handles released before the next.
         """
-        products = await ElementUtils.find_elements(
-            page, 
-            self.config.selectors["product_items"]
-        )
+        product_items = await ElementUtils.find_selector(page, self.config.selectors["product_items"])
+        if not product_items:
+            return []
         
         product_list = []
         
-        for product in products:
+        async def extract(product: ElementHandle):
             try:
-                product_data = await self.extract_product_data(product)
-                product_list.append(product_data)
+                product_list.append(await self.extract_product_data(product))
             except Exception as e:
                 logger.warning(f"Error parsing product: {e}")
-                continue
         
-        return product_list
\ No newline at end of file
+        await self.resources.map_elements(page, product_items, extract, stop=limit or None)
+        return product_list
@@ -1,8 +1,11 @@
+import asyncio
 import logging
-from typing import Dict
+from typing import Any, Dict, Optional
 from .browser_manager import BrowserManager
+from .html_extractor import HtmlProductExtractor
 from .product_extractor import ProductExtractor
 from config_loader import ScraperConfig
+from utils.snapshots import save_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -13,48 +16,76 @@ class AngeloniScraper:
     def __init__(self, config: ScraperConfig = None):
         self.config = config or ScraperConfig()
         self.browser_manager = BrowserManager(self.config)
-        self.product_extractor = ProductExtractor(self.config)
     
-    async def scrape_products(self, search_term: str) -> Dict:
+    async def scrape_products(self, search_term: str, limit: Optional[int] = None,
+                              max_pages: Optional[int] = None) -> Dict:
         """
         Scrape products from Angeloni website based on search term.
         
         Args:
             search_term: The product to search for
+            limit: Stop loading and extracting once this many products are found
+            max_pages: Maximum number of result pages to load
             
         Returns:
             Dictionary containing scraping results
         """
+        page = None
         try:
+            # Use one configuration snapshot for the whole scrape, even if it is hot-reloaded meanwhile
+            settings = self.config.current
+            product_extractor = ProductExtractor(settings, self.browser_manager.resources)
             page = await self.browser_manager.new_page()
             
             # Search for products
-            await self.product_extractor.search_products(page, search_term)
+            await product_extractor.search_products(page, search_term)
             
-            # Load all products
-            await self.product_extractor.load_all_products(page)
+            # Load products until enough are found
+            pagination = await product_extractor.load_all_products(page, search_term, limit, max_pages)
+            
+            # Keep the loaded page's HTML when it is parsed offline or saved as a snapshot
+            snapshot_dir = settings.session.get("snapshot_dir")
+            html = await page.content() if settings.extractor == "html" or snapshot_dir else None
+            if snapshot_dir:
+                await asyncio.to_thread(save_snapshot, snapshot_dir, "angeloni", search_term, html)
             
             # Extract product data
-            products = await self.product_extractor.extract_all_products(page)
+            if settings.extractor == "html":
+                products = HtmlProductExtractor(settings).extract_all_products(html, limit)
+            else:
+                products = await product_extractor.extract_all_products(page, limit)
+            await self.browser_manager.save_session()
             
             return {
                 "success": True,
                 "search_term": search_term,
                 "total_products": len(products),
-                "products": products
+                "products": products,
+                "limit": limit,
+                **pagination
             }
             
         except Exception as e:
             logger.error(f"Scraping error: {e}")
             return {
                 "success": False,
+                "error": str(e),
                 "search_term": search_term,
-                "error": str(e)
+                "total_products": 0,
+                "products": []
             }
+        finally:
+            if page:
+                await self.browser_manager.close_page(page)
     
     async def close(self):
         """
         Close the browser and clean up resources.
         """
         await self.browser_manager.close()
-        
\ No newline at end of file
+    
+    def resource_stats(self) -> Dict[str, Any]:
+        """
+        Return the browser's open pages and live element handles, for leak detection.
+        """
+        return self.browser_manager.resource_stats()
@@ -1,3 +1,5 @@
 from .loader import ScraperConfig
+from .settings import ScraperSettings
+from .watcher import ConfigWatcher
 
-__all__ = ["ScraperConfig"]
\ No newline at end of file
+__all__ = ["ScraperConfig", "ScraperSettings", "ConfigWatcher"]
\ No newline at end of file
@@ -1,54 +1,126 @@
+import logging
 import yaml
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from pathlib import Path
+from .settings import ScraperSettings, parse_settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=32)
+def _load_settings(config_path: Path, mtime_ns: int) -> ScraperSettings:
+    """
+    Parse and validate a configuration file, once per path and modification time.
+    """
+    try:
+        with open(config_path, 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    except yaml.YAMLError as e:
+        raise ValueError(f"Error parsing YAML configuration: {e}")
+
+    try:
+        return parse_settings(config)
+    except ValueError as e:
+        raise ValueError(f"Invalid configuration {config_path}: {e}")
+
 
 class ScraperConfig:
     """
     Unified configuration loader for scraper settings.
-    Loads configuration from YAML files and provides property accessors.
+    Holds the current validated snapshot of a YAML config file (see ScraperSettings)
+    and provides property accessors to it.
+
+    The snapshot is swapped as a whole by `reload()`, so code that takes
+    `current` once per scrape keeps a consistent configuration even if the
+    file changes mid-scrape.
     """
-    
+
     def __init__(self, config_filename: str):
         """
         Initialize the configuration loader.
-        
+
         Args:
             config_filename: Name of the YAML config file (e.g., 'giassi_config.yaml')
         """
         script_dir = Path(__file__).parent
         self.config_path = script_dir / config_filename
-        self._config = self._load_config()
-    
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from YAML file."""
+        self._mtime_ns = self._stat_mtime()
+        self.current: ScraperSettings = _load_settings(self.config_path, self._mtime_ns)
+
+    def _stat_mtime(self) -> int:
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as file:
-                return yaml.safe_load(file)
+            return self.config_path.stat().st_mtime_ns
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
-        except yaml.YAMLError as e:
-            raise ValueError(f"Error parsing YAML configuration: {e}")
-    
+
+    @property
+    def version(self) -> int:
+        """
+        Modification time (ns) of the file as last loaded; changes whenever `reload` loads it again.
+        """
+        return self._mtime_ns
+
+    def reload(self) -> bool:
+        """
+        Load the file again if it changed since the last load.
+
+        Returns:
+            True if a new snapshot was installed
+
+        Raises:
+            ValueError: If the changed file is invalid; the current snapshot is kept
+        """
+        mtime_ns = self._stat_mtime()
+        if mtime_ns == self._mtime_ns:
+            return False
+
+        # Remember the attempt so an invalid file is reported once, not on every check
+        self._mtime_ns = mtime_ns
+        self.current = _load_settings(self.config_path, mtime_ns)
+        logger.info(f"Reloaded configuration {self.config_path.name}")
+        return True
+
     @property
     def base_url(self) -> str:
-        return self._config["base_url"]
-    
+        return self.current.base_url
+
     @property
     def selectors(self) -> Dict[str, Any]:
-        return self._config["selectors"]
-    
+        return self.current.selectors
+
+    @property
+    def combined_selectors(self) -> Dict[str, str]:
+        return self.current.combined_selectors
+
     @property
     def timeouts(self) -> Dict[str, int]:
-        return self._config["timeouts"]
-    
+        return self.current.timeouts
+
     @property
     def browser_args(self) -> List[str]:
-        return self._config["browser_args"]
-    
+        return list(self.current.browser_args)
+
     @property
     def viewport(self) -> Dict[str, int]:
-        return self._config["viewport"]
-    
+        return dict(self.current.viewport)
+
     @property
     def user_agent(self) -> str:
-        return self._config["user_agent"]
\ No newline at end of file
+        return self.current.user_agent
+
+    @property
+    def pagination(self) -> Dict[str, Any]:
+        return self.current.pagination
+
+    @property
+    def session(self) -> Dict[str, Any]:
+        return self.current.session
+
+    def search_url(self, search_term: str, page: int = 1) -> Optional[str]:
+        """
+        Build the store's search results URL from the configured template.
+        """
+        return self.current.search_url(search_term, page)
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import quote, urlsplit, urlunsplit, parse_qsl, urlencode
+
+REQUIRED_SELECTORS = ("search_input", "product_items", "load_more", "name", "price", "unit_price")
+REQUIRED_TIMEOUTS = ("page_load", "element_wait", "load_more")
+EXTRACTORS = ("browser", "html")
+
+
+@dataclass(frozen=True)
+class ScraperSettings:
+    """
+    Validated, immutable snapshot of a scraper configuration file.
+
+    Every selector field is a tuple of selectors in priority order, and
+    `combined_selectors` holds each of them pre-joined into a single CSS
+    selector list for queries where any match will do. `extractor` picks how
+    products are read from the loaded results page: live element queries
+    ("browser") or parsing the page's HTML in one pass ("html").
+    """
+    base_url: str
+    selectors: Mapping[str, Tuple[str, ...]]
+    combined_selectors: Mapping[str, str]
+    timeouts: Mapping[str, int]
+    browser_args: Tuple[str, ...]
+    viewport: Mapping[str, int]
+    user_agent: str
+    search: Mapping[str, Any]
+    pagination: Mapping[str, Any]
+    session: Mapping[str, Any]
+    extractor: str = "browser"
+
+    def search_url(self, search_term: str, page: int = 1) -> Optional[str]:
+        """
+        Build the store's search results URL from the configured template.
+
+        Args:
+            search_term: Product to search for
+            page: Results page number (1-based)
+
+        Returns:
+            The search URL, or None if no template is configured
+        """
+        template = self.search.get("url_template")
+        if not template:
+            return None
+
+        url = template.format(
+            term=quote(search_term.strip(), safe=""),
+            page=page,
+            order=self.search.get("order") or ""
+        )
+        # Drop empty query parameters (e.g. an unset order) so the store uses its defaults
+        parts = urlsplit(url)
+        query = [(key, value) for key, value in parse_qsl(parts.query) if value]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _section(config: Dict[str, Any], key: str, required: bool = True) -> Dict[str, Any]:
+    value = config.get(key)
+    if value is None and not required:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}' must be a mapping")
+    return value
+
+
+def _selector_tuple(name: str, value: Any) -> Tuple[str, ...]:
+    selectors = (value,) if isinstance(value, str) else tuple(value or ())
+    if not selectors or not all(isinstance(s, str) and s.strip() for s in selectors):
+        raise ValueError(f"selector '{name}' must be a non-empty string or list of strings")
+    return selectors
+
+
+def parse_settings(config: Any) -> ScraperSettings:
+    """
+    Validate a parsed YAML configuration and normalize it into ScraperSettings.
+
+    Raises:
+        ValueError: If a required field is missing or has the wrong type
+    """
+    if not isinstance(config, dict):
+        raise ValueError("configuration must be a mapping")
+
+    base_url = config.get("base_url")
+    if not isinstance(base_url, str) or not base_url.startswith(("http://", "https://")):
+        raise ValueError("'base_url' must be an http(s) URL")
+
+    raw_selectors = _section(config, "selectors")
+    missing = [name for name in REQUIRED_SELECTORS if name not in raw_selectors]
+    if missing:
+        raise ValueError(f"missing selectors: {', '.join(missing)}")
+    selectors = {name: _selector_tuple(name, value) for name, value in raw_selectors.items()}
+
+    timeouts = _section(config, "timeouts")
+    missing = [name for name in REQUIRED_TIMEOUTS if name not in timeouts]
+    if missing:
+        raise ValueError(f"missing timeouts: {', '.join(missing)}")
+    for name, value in timeouts.items():
+        if not isinstance(value, int) or value < 0:
+            raise ValueError(f"timeout '{name}' must be a non-negative integer (milliseconds)")
+
+    browser_args = config.get("browser_args") or []
+    if not isinstance(browser_args, list) or not all(isinstance(arg, str) for arg in browser_args):
+        raise ValueError("'browser_args' must be a list of strings")
+
+    viewport = _section(config, "viewport")
+    if not all(isinstance(viewport.get(key), int) for key in ("width", "height")):
+        raise ValueError("'viewport' must have integer width and height")
+
+    user_agent = config.get("user_agent")
+    if not isinstance(user_agent, str) or not user_agent:
+        raise ValueError("'user_agent' must be a non-empty string")
+
+    search = _section(config, "search", required=False)
+    if search.get("url_template") and "{term}" not in search["url_template"]:
+        raise ValueError("'search.url_template' must contain {term}")
+
+    extractor = config.get("extractor", "browser")
+    if extractor not in EXTRACTORS:
+        raise ValueError(f"'extractor' must be one of: {', '.join(EXTRACTORS)}")
+
+    return ScraperSettings(
+        base_url=base_url,
+        selectors=MappingProxyType(selectors),
+        combined_selectors=MappingProxyType({name: ", ".join(value) for name, value in selectors.items()}),
+        timeouts=MappingProxyType(dict(timeouts)),
+        browser_args=tuple(browser_args),
+        viewport=MappingProxyType(dict(viewport)),
+        user_agent=user_agent,
+        search=MappingProxyType(dict(search)),
+        pagination=MappingProxyType(dict(_section(config, "pagination", required=False))),
+        session=MappingProxyType(dict(_section(config, "session", required=False))),
+        extractor=extractor,
+    )
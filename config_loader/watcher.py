@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from .loader import ScraperConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigWatcher:
+    """
+    Polls scraper configuration files and hot-reloads them when they change.
+
+    Used as an async context manager around the server's lifetime. Nested
+    uses share one polling task, which stops when the last one exits.
+    Invalid edits are logged and ignored, keeping the previous configuration.
+    """
+
+    def __init__(self, configs: List[ScraperConfig], interval: float = 2.0):
+        """
+        Initialize the watcher.
+
+        Args:
+            configs: Configurations to keep up to date
+            interval: Seconds between checks of the files' modification times
+        """
+        self.configs = configs
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._users = 0
+
+    async def __aenter__(self):
+        self._users += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._users -= 1
+        if self._users == 0 and self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def check(self) -> None:
+        """
+        Reload every configuration whose file changed.
+        """
+        for config in self.configs:
+            try:
+                config.reload()
+            except (ValueError, FileNotFoundError) as e:
+                logger.error(f"Keeping previous configuration: {e}")
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.check()
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Optional, Sequence
 from playwright.async_api import Page
 
 
@@ -8,29 +8,38 @@ class ElementUtils:
     """
     
     @staticmethod
-    async def find_element(page: Page, selectors: List[str], timeout: int) -> Optional[any]:
+    async def find_element(page: Page, selectors: Sequence[str], timeout: int,
+                           combined_selector: Optional[str] = None) -> Optional[any]:
         """
         Find the first matching element from a list of selectors.
+        Waits once for any of them (using the precompiled combined selector when
+        given), then returns the match of the highest-priority selector.
         """
+        try:
+            # Waits through a locator, which (unlike wait_for_selector) creates no element handle
+            await page.locator(combined_selector or ", ".join(selectors)).first.wait_for(timeout=timeout)
+        except Exception:
+            return None
+        
         for selector in selectors:
-            try:
-                return await page.wait_for_selector(selector, timeout=timeout)
-            except:
-                continue
+            element = await page.query_selector(selector)
+            if element:
+                return element
         return None
     
     @staticmethod
-    async def extract_text(element, selectors: List[str]) -> Optional[str]:
+    async def extract_text(element, selectors: Sequence[str]) -> Optional[str]:
         """
-        Extract text content from an element using multiple selector strategies.
+        Extract text content from an element using multiple selector strategies,
+        tried in priority order.
         """
-        if isinstance(selectors, str):
-            selectors = [selectors]
-            
         for selector in selectors:
             el = await element.query_selector(selector)
             if el:
-                text = await el.text_content()
+                try:
+                    text = await el.text_content()
+                finally:
+                    await el.dispose()
                 if text and text.strip():
                     return text.strip()
         return None
\ No newline at end of file
@@ -0,0 +1,48 @@
+import logging
+from typing import Dict, List, Optional
+from config_loader import ScraperSettings
+from utils.html_parser import parse_html, extract_text
+
+logger = logging.getLogger(__name__)
+
+class HtmlProductExtractor:
+    """
+    Extracts products from a Giassi results page's HTML without a browser.
+    Uses the same selectors and rules as ProductExtractor.extract_all_products,
+    so it can parse a live page's content in one pass or re-extract saved snapshots.
+    """
+    
+    def __init__(self, config: ScraperSettings):
+        self.config = config
+    
+    def extract_product_data(self, product) -> Dict[str, str]:
+        """
+        Extract product information from a product card node.
+        """
+        name = extract_text(product, self.config.selectors["name"])
+        price = extract_text(product, self.config.selectors["price"])
+        unit_price = extract_text(product, self.config.selectors["unit_price"])
+        
+        return {
+            "name": name or "Unknown",
+            "price": price or "Price not available",
+            "unit_price": unit_price if unit_price and unit_price != price else ""
+        }
+    
+    def extract_all_products(self, html: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Extract data from all product cards in the HTML, or only the first `limit`.
+        """
+        products = parse_html(html).css(self.config.combined_selectors["product_items"])
+        if limit:
+            products = products[:limit]
+        product_list = []
+        
+        for product in products:
+            try:
+                product_list.append(self.extract_product_data(product))
+            except Exception as e:
+                logger.warning(f"Error parsing product: {e}")
+                continue
+        
+        return product_list
@@ -1,8 +1,10 @@
 import asyncio
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from playwright.async_api import Page
-from config_loader import ScraperConfig
+from config_loader import ScraperSettings
+from utils.ranking import relevant_ratio
+from utils.resource_tracker import ResourceTracker, count_elements
 from .element_utils import ElementUtils
 
 logger = logging.getLogger(__name__)
@@ -12,58 +14,122 @@ class ProductExtractor:
     Handles product search and data extraction.
     """
     
-    def __init__(self, config: ScraperConfig):
+    def __init__(self, config: ScraperSettings, resources: Optional[ResourceTracker] = None):
         self.config = config
+        self.resources = resources or ResourceTracker("giassi")
     
     async def search_products(self, page: Page, search_term: str):
+        """
+        Open the search results for a term, navigating straight to the results
+        URL when a template is configured and typing the search otherwise.
+        """
+        search_url = self.config.search_url(search_term)
+        if search_url:
+            try:
+                await self.open_search_url(page, search_url)
+                return
+            except Exception as e:
+                logger.warning(f"Direct search navigation failed, falling back to typed search: {e}")
+        
+        await self.type_search(page, search_term)
+    
+    async def open_search_url(self, page: Page, search_url: str):
+        """
+        Navigate directly to a search results URL.
+        """
+        await page.goto(search_url, timeout=self.config.timeouts["page_load"])
+        await page.locator(self.config.combined_selectors["product_items"]).first.wait_for(
+            timeout=self.config.timeouts["element_wait"]
+        )
+        await asyncio.sleep(2)
+    
+    async def type_search(self, page: Page, search_term: str):
         """
         Navigate to site and perform a product search.
         """
         await page.goto(self.config.base_url, timeout=self.config.timeouts["page_load"])
         await asyncio.sleep(2)
         
-        search_input = await page.wait_for_selector(
-            self.config.selectors["search_input"],
-            timeout=self.config.timeouts["element_wait"]
-        )
+        # Locators resolve the element on each action, without holding an element handle
+        search_input = page.locator(self.config.combined_selectors["search_input"]).first
+        await search_input.wait_for(timeout=self.config.timeouts["element_wait"])
         
         await search_input.click()
         await search_input.fill(search_term)
         await page.keyboard.press('Enter')
         
-        await page.wait_for_selector(
-            self.config.selectors["product_items"],
+        await page.locator(self.config.combined_selectors["product_items"]).first.wait_for(
             timeout=self.config.timeouts["element_wait"]
         )
         await asyncio.sleep(2)
     
-    async def load_all_products(self, page: Page):
+    async def load_all_products(self, page: Page, search_term: Optional[str] = None,
+                                limit: Optional[int] = None, max_pages: Optional[int] = None) -> Dict[str, Any]:
         """
-        Load all products by clicking 'load more' until no more products.
+        Load products by clicking 'load more' until no more products, or until enough were found.
+        
+        Loading stops once `limit` products are on the page or `max_pages` pages were
+        loaded (pagination.max_pages by default). Without a limit, it also stops when
+        less than pagination.min_relevant_ratio of a newly loaded page matches the search.
+        Products are counted without holding handles to them.
+        
+        Returns:
+            Dictionary with the number of pages loaded, whether the results ran out
+            and the number of products on the first page
         """
+        product_items = self.config.combined_selectors["product_items"]
+        max_pages = max_pages or self.config.pagination.get("max_pages", 10)
+        min_relevant_ratio = self.config.pagination.get("min_relevant_ratio", 0)
         previous_count = 0
+        pages_loaded = 0
+        first_page_products = 0
+        exhausted = False
         
         while True:
-            current_products = await page.query_selector_all(self.config.selectors["product_items"])
-            current_count = len(current_products)
+            current_count = await count_elements(page, product_items)
             
             if current_count == previous_count:
+                exhausted = True
                 break
             
+            pages_loaded += 1
+            if pages_loaded == 1:
+                first_page_products = current_count
+            if limit and current_count >= limit:
+                break
+            if pages_loaded >= max_pages:
+                break
+            if not limit and search_term and previous_count and min_relevant_ratio:
+                names = await self.resources.map_elements(
+                    page, product_items,
+                    lambda product: ElementUtils.extract_text(product, self.config.selectors["name"]),
+                    start=previous_count
+                )
+                if relevant_ratio(names, search_term) < min_relevant_ratio:
+                    logger.info(f"Stopping after {pages_loaded} pages, new products no longer match '{search_term}'")
+                    break
+            
             previous_count = current_count
             
-            load_button = await ElementUtils.find_element(
+            load_button = self.resources.track(await ElementUtils.find_element(
                 page,
                 self.config.selectors["load_more"],
-                self.config.timeouts["load_more"]
-            )
+                self.config.timeouts["load_more"],
+                self.config.combined_selectors["load_more"]
+            ))
             
             if not load_button:
+                exhausted = True
                 break
             
-            await load_button.scroll_into_view_if_needed()
-            await load_button.click()
+            try:
+                await load_button.scroll_into_view_if_needed()
+                await load_button.click()
+            finally:
+                await self.resources.dispose([load_button])
             await asyncio.sleep(self.config.timeouts["load_more"] / 1000)
+        
+        return {"pages_loaded": pages_loaded, "exhausted": exhausted, "first_page_products": first_page_products}
     
     async def extract_product_data(self, product) -> Dict[str, str]:
         """
@@ -79,19 +145,18 @@ class ProductExtractor:
             "unit_price": unit_price if unit_price and unit_price != price else ""
         }
     
-    async def extract_all_products(self, page: Page) -> List[Dict[str, str]]:
+    async def extract_all_products(self, page: Page, limit: Optional[int] = None) -> List[Dict[str, str]]:
         """
-        Extract data from all product elements on the page.
+        Extract data from all product elements on the page, or only the first `limit`.
+        Product elements are visited in chunks, each chunk's handles released before the next.
         """
-        products = await page.query_selector_all(self.config.selectors["product_items"])
         product_list = []
         
-        for product in products:
+        async def extract(product):
             try:
-                product_data = await self.extract_product_data(product)
-                product_list.append(product_data)
+                product_list.append(await self.extract_product_data(product))
             except Exception as e:
                 logger.warning(f"Error parsing product: {e}")
-                continue
         
+        await self.resources.map_elements(page, self.config.combined_selectors["product_items"], extract, stop=limit or None)
         return product_list
\ No newline at end of file
@@ -1,7 +1,10 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from config_loader import ScraperConfig
+from utils.snapshots import save_snapshot
 from .browser_manager import BrowserManager
+from .html_extractor import HtmlProductExtractor
 from .product_extractor import ProductExtractor
 
 logger = logging.getLogger(__name__)
@@ -19,7 +22,6 @@ class GiassiScraper:
         """
         self.config = config
         self.browser_manager = BrowserManager(self.config)
-        self.product_extractor = ProductExtractor(self.config)
     
     async def close(self):
         """
@@ -27,10 +29,22 @@ class GiassiScraper:
         """
         await self.browser_manager.close()
     
-    async def scrape_products(self, search_term: str) -> Dict[str, Any]:
+    def resource_stats(self) -> Dict[str, Any]:
+        """
+        Return the browser's open pages and live element handles, for leak detection.
+        """
+        return self.browser_manager.resource_stats()
+    
+    async def scrape_products(self, search_term: str, limit: Optional[int] = None,
+                              max_pages: Optional[int] = None) -> Dict[str, Any]:
         """
         Main method to scrape products for a given search term.
         Orchestrates the entire scraping process using specialized components.
+        
+        Args:
+            search_term: The product to search for
+            limit: Stop loading and extracting once this many products are found
+            max_pages: Maximum number of result pages to load
         """
         if not search_term or not search_term.strip():
             return {
@@ -43,16 +57,30 @@ class GiassiScraper:
         
         page = None
         try:
+            # Use one configuration snapshot for the whole scrape, even if it is hot-reloaded meanwhile
+            settings = self.config.current
+            product_extractor = ProductExtractor(settings, self.browser_manager.resources)
             page = await self.browser_manager.new_page()
-            await self.product_extractor.search_products(page, search_term)
-            await self.product_extractor.load_all_products(page)
-            product_list = await self.product_extractor.extract_all_products(page)
+            await product_extractor.search_products(page, search_term)
+            pagination = await product_extractor.load_all_products(page, search_term, limit, max_pages)
+            
+            snapshot_dir = settings.session.get("snapshot_dir")
+            html = await page.content() if settings.extractor == "html" or snapshot_dir else None
+            if snapshot_dir:
+                await asyncio.to_thread(save_snapshot, snapshot_dir, "giassi", search_term, html)
+            if settings.extractor == "html":
+                product_list = HtmlProductExtractor(settings).extract_all_products(html, limit)
+            else:
+                product_list = await product_extractor.extract_all_products(page, limit)
+            await self.browser_manager.save_session()
             
             return {
                 "success": True,
                 "search_term": search_term,
                 "total_products": len(product_list),
-                "products": product_list
+                "products": product_list,
+                "limit": limit,
+                **pagination
             }
             
         except Exception as e:
@@ -66,4 +94,4 @@ class GiassiScraper:
             }
         finally:
             if page:
-                await page.close()
\ No newline at end of file
+                await self.browser_manager.close_page(page)
\ No newline at end of file
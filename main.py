@@ -1,101 +1,291 @@
 import logging
 import asyncio
 import json
-from fastmcp import FastMCP
-from giassi.scraper import GiassiScraper
+import os
+import threading
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING, List, Optional
+from fastmcp import FastMCP, Context
+from fastmcp.server.dependencies import get_http_headers
 from utils.formatter import Formatter
 from utils.product_list import ProductList
-from angeloni.scraper import AngeloniScraper
-from config_loader import ScraperConfig
-from utils.calc_distance import FindDistance
 from utils.price_calculator import sum_prices_by_store
+from utils.scheduler import ScrapeScheduler
+from utils.result_cache import ResultCache
+from utils.state_backend import create_backend
+from utils.pagination import SearchCursor, MIN_RESPONSE_CHARS, OUTPUT_MODES
+from utils.ranking import SORT_OPTIONS, UNIT_OPTIONS, rank_results
+from utils.list_repricer import prices_from_refresh, reprice_items
+from utils.basket_optimizer import find_offers, merge_quantities, parse_item, optimize_basket as solve_basket
+
+if TYPE_CHECKING:
+    from config_loader import ConfigWatcher
+    from utils.price_history import PriceHistory
+    from utils.scraper_pool import ScraperPool
+    from utils.search_service import SearchService
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load configurations
-giassi_config = ScraperConfig('giassi_config.yaml')
-angeloni_config = ScraperConfig('angeloni_config.yaml')
+# Scrapers (Playwright), store configs and the price history are built on first
+# use or by the background warm-up, so the server answers tools/list right away
+_init_lock = threading.Lock()
+_search_service: Optional["SearchService"] = None
+_config_watcher: Optional["ConfigWatcher"] = None
+_price_history: Optional["PriceHistory"] = None
+_scraper_pool: Optional["ScraperPool"] = None
+
+# Directory of the store config files; by default the ones in config_loader/ (e.g. fixture stores for load tests)
+SCRAPER_CONFIG_DIR = os.environ.get("SCRAPER_CONFIG_DIR", "")
+
+# Store name -> (scraper module, scraper class, config file)
+SCRAPER_STORES = {
+    "Giassi": ("giassi.scraper", "GiassiScraper", os.path.join(SCRAPER_CONFIG_DIR, "giassi_config.yaml")),
+    "Angeloni": ("angeloni.scraper", "AngeloniScraper", os.path.join(SCRAPER_CONFIG_DIR, "angeloni_config.yaml")),
+}
+
+# Scrapes running at once across all stores
+MAX_CONCURRENT_SCRAPES = int(os.environ.get("MAX_CONCURRENT_SCRAPES", "4"))
+
+# Worker processes that run the scrapers, one scrape at a time each; 0 runs them in the server's
+# own event loop. Defaults to one per admitted scrape, so admitted scrapes never queue for a worker
+SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", str(MAX_CONCURRENT_SCRAPES)))
+
+# Seconds a search may take per store, queueing included; stores still running are reported as timed out
+SEARCH_DEADLINE = float(os.environ.get("SEARCH_DEADLINE", "90"))
+
+def get_price_history() -> "PriceHistory":
+    """
+    Return the price history store, opening it on first use.
+    """
+    global _price_history
+    with _init_lock:
+        if _price_history is None:
+            from utils.price_history import PriceHistory
+            _price_history = PriceHistory()
+        return _price_history
+
+def get_search_service() -> "SearchService":
+    """
+    Return the search service, loading the store configs and setting up the
+    scrapers on first use. Worker processes and browsers are only started by
+    the first search.
+    """
+    global _search_service, _config_watcher, _scraper_pool
+    price_history = get_price_history()
+    with _init_lock:
+        if _search_service is None:
+            from config_loader import ScraperConfig, ConfigWatcher
+            from utils.scraper_pool import PooledScraper, ScraperPool, create_scraper
+            from utils.search_service import SearchService
+            
+            configs = {store: ScraperConfig(spec[2]) for store, spec in SCRAPER_STORES.items()}
+            
+            # Hot-reload edited configs; running scrapes keep the snapshot they started with
+            _config_watcher = ConfigWatcher(list(configs.values()))
+            
+            if SCRAPER_WORKERS > 0:
+                # Scrape in worker processes, each with its own browsers, off the MCP event loop
+                _scraper_pool = ScraperPool(SCRAPER_STORES, SCRAPER_WORKERS)
+                scrapers = {store: PooledScraper(_scraper_pool, store, config) for store, config in configs.items()}
+            else:
+                # Long-lived scrapers, one shared browser per store
+                scrapers = {store: create_scraper(SCRAPER_STORES[store], config) for store, config in configs.items()}
+            
+            _search_service = SearchService(
+                scrapers,
+                scheduler,
+                price_history,
+                ResultCache(state_backend),
+                deadline=SEARCH_DEADLINE
+            )
+        return _search_service
+
+async def get_search_service_async() -> "SearchService":
+    """
+    Return the search service from async code. While it is being built (by the
+    warm-up or another tool) the wait for the init lock and the build itself run
+    in a thread, so the event loop keeps serving.
+    """
+    if _search_service is not None:
+        return _search_service
+    return await asyncio.to_thread(get_search_service)
+
+async def get_price_history_async() -> "PriceHistory":
+    """
+    Return the price history store from async code, opening it in a thread on first use.
+    """
+    if _price_history is not None:
+        return _price_history
+    return await asyncio.to_thread(get_price_history)
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """
+    Start serving immediately and warm up the scrapers in the background,
+    then keep watching their configs for changes.
+    """
+    async def warm_up_and_watch():
+        await asyncio.to_thread(get_search_service)
+        logger.info("Scrapers ready")
+        async with _config_watcher:
+            await asyncio.Event().wait()
+    
+    task = asyncio.create_task(warm_up_and_watch())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        if _search_service is not None:
+            await _search_service.close()
+        state_backend.close()
 
 # Create FastMCP server
-mcp = FastMCP("Product Search")
+mcp = FastMCP("Product Search", lifespan=lifespan)
 
-# Initialize product list manager
-product_list = ProductList()
+# Shopping lists, cached results and scrape locks; set STATE_BACKEND_URL=redis://... to share them between workers
+state_backend = create_backend()
+
+# Initialize product list manager; its methods block (file or backend I/O), so tools call them in a thread
+product_list = ProductList(backend=state_backend if state_backend.shared else None)
+
+# Admission control for concurrent scrapes (each one drives a page in a headless Chromium).
+# With a worker pool, no more scrapes are admitted than there are workers to run them
+max_concurrent = min(MAX_CONCURRENT_SCRAPES, SCRAPER_WORKERS) if SCRAPER_WORKERS > 0 else MAX_CONCURRENT_SCRAPES
+scheduler = ScrapeScheduler(
+    max_concurrent=max_concurrent, per_store_limit=min(2, max_concurrent), max_queue=20, max_wait=60.0
+)
+
+def get_caller_id(ctx: Context) -> str:
+    """
+    Identify the user behind a tool call for fair scheduling.
+    """
+    headers = get_http_headers()
+    return headers.get("x-openwebui-user-id") or ctx.session_id or ctx.client_id or "anonymous"
 
 @mcp.tool()
-async def search_products(search_term: str) -> str:
+async def search_products(
+    search_term: str,
+    ctx: Context,
+    sort_by: str = "relevance",
+    top_k: int = 20,
+    output: str = "text",
+    cursor: Optional[str] = None,
+    max_chars: int = 8000,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    unit: Optional[str] = None,
+    limit: Optional[int] = None
+) -> str:
     """
     Search for products on both Giassi and Angeloni supermarket websites concurrently
     
     Args:
         search_term: Product to search for (e.g., 'arroz', 'leite', 'açúcar')
+        sort_by: 'relevance' (best match first), 'price' (cheapest first) or 'unit_price' (cheapest per kg/l/un first)
+        top_k: Maximum number of products shown per store
+        output: 'text', 'compact' (one line per product) or 'json'
+        cursor: Cursor from a previous response to get the next page of the same search
+        max_chars: Maximum size of the response (at least 1000); fewer products are shown if needed
+        min_price: Only show products costing at least this much
+        max_price: Only show products costing at most this much
+        unit: Only show products sold by 'kg', 'g', 'l', 'ml' or 'un'
+        limit: Stop loading each store's results once this many products are found
+               (faster); by default loading stops when results stop matching the search
     
     Returns:
         Formatted list of products from both stores with names and prices
     """
-    logger.info(f"Searching both stores for: {search_term}")
-    
-    # Create scrapers
-    giassi_scraper = GiassiScraper(giassi_config)
-    angeloni_scraper = AngeloniScraper(angeloni_config)
-    
-    async def search_giassi():
+    if max_chars < MIN_RESPONSE_CHARS:
+        return f"Error: max_chars must be at least {MIN_RESPONSE_CHARS}"
+    if cursor:
         try:
-            results = await giassi_scraper.scrape_products(search_term.strip())
-            return ("Giassi", results)
-        except Exception as e:
-            logger.error(f"Giassi search error: {e}")
-            return ("Giassi", f"Error: {str(e)}")
-        finally:
-            await giassi_scraper.close()
+            page = SearchCursor.decode(cursor)
+        except ValueError as e:
+            return f"Error: {str(e)}. Start a new search without a cursor."
+    else:
+        if sort_by not in SORT_OPTIONS:
+            return f"Error: sort_by must be one of {', '.join(SORT_OPTIONS)}"
+        if output not in OUTPUT_MODES:
+            return f"Error: output must be one of {', '.join(OUTPUT_MODES)}"
+        if unit is not None and unit not in UNIT_OPTIONS:
+            return f"Error: unit must be one of {', '.join(UNIT_OPTIONS)}"
+        page = SearchCursor(
+            search_term.strip(), sort_by, max(1, top_k), output,
+            min_price=min_price, max_price=max_price, unit=unit
+        )
     
-    async def search_angeloni():
-        try:
-            results = await angeloni_scraper.scrape_products(search_term.strip())
-            return ("Angeloni", results)
-        except Exception as e:
-            logger.error(f"Angeloni search error: {e}")
-            return ("Angeloni", f"Error: {str(e)}")
-        finally:
-            await angeloni_scraper.close()
+    logger.info(f"Searching both stores for: {page.search_term}")
     
     try:
-        # Run both searches concurrently
-        giassi_result, angeloni_result = await asyncio.gather(
-            search_giassi(),
-            search_angeloni(),
-            return_exceptions=True
+        search_service = await get_search_service_async()
+        user = get_caller_id(ctx)
+        # Run both searches concurrently; a store that misses its budget is reported as an error.
+        # A cursor pages through the cached results of the first page, even limited ones
+        results_by_store = await search_service.search_all(
+            page.search_term, user, limit if not cursor else None, offsets=page.offsets if cursor else None
         )
         
-        # Format combined results
-        formatted_output = []
-        
-        # Handle Giassi results
-        store_name, results = giassi_result
-        if isinstance(results, str) and results.startswith("Error"):
-            formatted_output.append(f"\n=== {store_name} ===\n{results}")
-        else:
-            formatted_giassi = Formatter.format_results(results)
-            formatted_output.append(f"\n=== {store_name} ===\n{formatted_giassi}")
+        # Drop unrelated products and apply filters/ordering before formatting
+        results_by_store = {store: rank_results(results, page) for store, results in results_by_store.items()}
+        if cursor:
+            # Paging past the end of limited results needs the store's full results
+            short = [
+                store for store, results in results_by_store.items()
+                if results["success"] and results.get("limit") is not None and not results.get("exhausted")
+                and page.offsets.get(store, 0) >= results["total_products"]
+            ]
+            full = await asyncio.gather(*(search_service.search(store, page.search_term, user) for store in short))
+            results_by_store.update({store: rank_results(results, page) for store, results in zip(short, full)})
+        response = Formatter.format_search_page(results_by_store, page, max_chars)
         
-        # Handle Angeloni results
-        store_name, results = angeloni_result
-        if isinstance(results, str) and results.startswith("Error"):
-            formatted_output.append(f"\n=== {store_name} ===\n{results}")
-        else:
-            formatted_angeloni = Formatter.format_results(results)
-            formatted_output.append(f"\n=== {store_name} ===\n{formatted_angeloni}")
-
-        logger.info("\n".join(formatted_output))
-
-        return "\n".join(formatted_output)
+        logger.info(
+            f"Search for '{page.search_term}': "
+            + ", ".join(f"{store}={results['total_products']}" for store, results in results_by_store.items())
+            + f" products, {len(response)} chars returned"
+        )
+        return response
         
     except Exception as e:
         logger.error(f"Concurrent search error: {e}")
         return f"Error during concurrent search: {str(e)}"
 
+@mcp.tool()
+async def refresh_search(search_term: str, ctx: Context) -> str:
+    """
+    Check whether previously searched results are still current and update them if not.
+    Much cheaper than a new search: each store's first results page is compared with
+    the cached results, and the full search is only redone where something changed.
+    
+    Args:
+        search_term: Product search to refresh (e.g., 'arroz')
+    
+    Returns:
+        Per store whether results changed, with the products whose price changed
+        and the shopping list products repriced with them
+    """
+    search_term = search_term.strip()
+    if not search_term:
+        return "Error: search_term cannot be empty"
+    
+    try:
+        search_service = await get_search_service_async()
+        outcomes = await search_service.refresh_all(search_term, get_caller_id(ctx))
+        # Reprice listed products whose price changed, so totals built from the list stay current
+        list_updates = None
+        prices = prices_from_refresh(outcomes)
+        if prices:
+            report = await asyncio.to_thread(product_list.update_prices, prices)
+            list_updates = [
+                entry for entry in report
+                if entry['new_price'] is not None and entry['new_price'] != entry['old_price']
+            ]
+        return Formatter.format_refresh(search_term, outcomes, list_updates=list_updates)
+    except Exception as e:
+        logger.error(f"Refresh error: {e}")
+        return f"Error refreshing search: {str(e)}"
+
 @mcp.tool()
 async def add_to_list(unidades: str, product_name: str, store: str, price: str) -> str:
     """
@@ -109,7 +299,7 @@ async def add_to_list(unidades: str, product_name: str, store: str, price: str)
     Returns:
         Confirmation message
     """
-    return product_list.add_product(unidades, product_name, store, price)
+    return await asyncio.to_thread(product_list.add_product, unidades, product_name, store, price)
 
 @mcp.tool()
 async def view_list() -> str:
@@ -119,7 +309,7 @@ async def view_list() -> str:
     Returns:
         Formatted list of all products
     """
-    return product_list.view_products()
+    return await asyncio.to_thread(product_list.view_products)
 
 @mcp.tool()
 async def remove_from_list(product_name: str) -> str:
@@ -132,7 +322,7 @@ async def remove_from_list(product_name: str) -> str:
     Returns:
         Confirmation message
     """
-    return product_list.remove_product(product_name)
+    return await asyncio.to_thread(product_list.remove_product, product_name)
 
 @mcp.tool()
 async def update_unidades(product_name: str, new_unidades: str) -> str:
@@ -146,7 +336,7 @@ async def update_unidades(product_name: str, new_unidades: str) -> str:
     Returns:
         Confirmation message
     """
-    return product_list.update_unidades(product_name, new_unidades)
+    return await asyncio.to_thread(product_list.update_unidades, product_name, new_unidades)
 
 @mcp.tool()
 async def find_nearest_supermarket(address: str) -> str:
@@ -159,6 +349,8 @@ async def find_nearest_supermarket(address: str) -> str:
     Returns:
         Information about the closest supermarket including name, address, and distance
     """
+    from utils.calc_distance import FindDistance
+    
     finder = FindDistance()
     try:
         result = finder.find_closest_supermarket(address)
@@ -186,7 +378,143 @@ async def calculate_shopping_totals() -> str:
     Returns:
         Total prices separated by supermarket with grand total
     """
-    return sum_prices_by_store()
+    return sum_prices_by_store(products=await asyncio.to_thread(product_list.get_products))
+
+@mcp.tool()
+async def refresh_list_prices(ctx: Context) -> str:
+    """
+    Update the prices in the shopping list to the stores' current prices, in one batched pass
+    
+    Returns:
+        Products whose price changed, products that could not be found and the updated totals per supermarket
+    """
+    items = await asyncio.to_thread(product_list.get_products)
+    if not items:
+        return "Your product list is empty"
+    
+    try:
+        search_service = await get_search_service_async()
+        prices = await reprice_items(
+            items,
+            search_service,
+            await get_price_history_async(),
+            get_caller_id(ctx),
+            max_age=search_service.result_cache.ttl,
+            concurrency=scheduler.per_store_limit
+        )
+        return Formatter.format_repricing(await asyncio.to_thread(product_list.update_prices, prices))
+    except Exception as e:
+        logger.error(f"Error refreshing list prices: {e}")
+        return f"Error refreshing list prices: {str(e)}"
+
+@mcp.tool()
+async def price_trend(product_name: str, store: Optional[str] = None, days: int = 90) -> str:
+    """
+    Show the price history of a product from previous searches: current, min, average and trend
+    
+    Args:
+        product_name: Name (or part of the name) of the product (e.g., 'Arroz Tio João 5kg')
+        store: Optional store filter ('Giassi' or 'Angeloni')
+        days: How many days of history to consider
+    
+    Returns:
+        Price summary and trend for the best matching products
+    """
+    price_history = await get_price_history_async()
+    
+    def lookup():
+        # SQLite queries block, so they run in a thread
+        matches = price_history.find_products(product_name, store, limit=3)
+        return matches, [price_history.trend(product["store"], product["product_id"], days) for product in matches]
+    
+    matches, trends = await asyncio.to_thread(lookup)
+    if not matches:
+        return f"No price history for '{product_name}' yet. Search for it first to start tracking its price."
+    
+    summaries = [
+        Formatter.format_price_trend(product, trend) for product, trend in zip(matches, trends) if trend
+    ]
+    
+    if not summaries:
+        return f"No prices recorded for '{product_name}' in the last {days} days."
+    return "\n\n".join(summaries)
+
+@mcp.tool()
+async def optimize_basket(
+    items: List[str],
+    ctx: Context,
+    address: Optional[str] = None,
+    max_stores: int = 2,
+    cost_per_km: float = 1.0
+) -> str:
+    """
+    Find the cheapest way to buy a list of items across Giassi and Angeloni,
+    optionally accounting for the travel distance to each store
+    
+    Args:
+        items: Items to buy, optionally with a quantity (e.g., ['2 leite integral', 'arroz 5kg', 'café'])
+        address: The user's address, to add the round-trip travel cost to each store visited
+        max_stores: Visit at most this many stores (1 or 2)
+        cost_per_km: Travel cost in R$ per km driven
+    
+    Returns:
+        The cheapest assignment of items to stores with totals, and the alternatives
+    """
+    parsed = [parse_item(item) for item in items if item.strip()]
+    if not parsed:
+        return "Please provide at least one item."
+    quantities = merge_quantities(parsed)
+    search_service = await get_search_service_async()
+    stores = list(search_service.scrapers)
+    
+    async def travel_distances():
+        if not address:
+            return {}
+        try:
+            from utils.calc_distance import FindDistance
+            return await asyncio.to_thread(FindDistance().distance_by_store, address, stores)
+        except Exception as e:
+            logger.error(f"Error computing store distances: {e}")
+            return {}
+    
+    offers, distances = await asyncio.gather(
+        find_offers(list(quantities), search_service, get_caller_id(ctx)),
+        travel_distances()
+    )
+    travel_costs = {store: km * 2 * cost_per_km for store, km in distances.items()}
+    
+    plans = solve_basket(offers, quantities, travel_costs, max(1, max_stores))
+    return Formatter.format_basket(plans, distances)
+
+@mcp.tool()
+async def server_status() -> str:
+    """
+    Show scrape load on the server: running searches, queue depth, wait times,
+    the circuit breaker state of each store and the pages and element handles
+    each store's browser holds open
+    
+    Returns:
+        Server statistics as JSON
+    """
+    search_service = await get_search_service_async()
+    stats = search_service.stats()
+    if _scraper_pool is not None:
+        stats["scraper_pool"] = _scraper_pool.stats()
+    else:
+        stats["browser_resources"] = {
+            store: scraper.resource_stats() for store, scraper in search_service.scrapers.items()
+        }
+    return json.dumps(stats, indent=2)
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO)
+    # stdio by default (Open WebUI via mcpo); MCP_TRANSPORT=http serves streamable HTTP directly
+    transport = os.environ.get("MCP_TRANSPORT", "stdio")
+    if transport == "stdio":
+        mcp.run()
+    else:
+        mcp.run(
+            transport=transport,
+            host=os.environ.get("MCP_HOST", "127.0.0.1"),
+            port=int(os.environ.get("MCP_PORT", "8000"))
+        )
\ No newline at end of file
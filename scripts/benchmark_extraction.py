@@ -0,0 +1,102 @@
+"""
+Benchmark offline HTML extraction against the live Playwright extractor.
+
+Both engines extract the same fixtures: generated results pages shaped like
+each store's markup, plus any snapshot files given (see the `snapshot_dir`
+config option). The browser side loads each fixture with `page.set_content`
+and runs ProductExtractor.extract_all_products; the offline side runs
+HtmlProductExtractor.extract_all_products on the HTML. Outputs are compared.
+
+Usage:
+    uv run python scripts/benchmark_extraction.py [--products 200] [--runs 5] [snapshot.html ...]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config_loader import ScraperConfig  # noqa: E402
+from fixtures import build_fixture  # noqa: E402
+from utils.snapshots import snapshot_info  # noqa: E402
+from giassi.html_extractor import HtmlProductExtractor as GiassiHtmlExtractor  # noqa: E402
+from giassi.product_extractor import ProductExtractor as GiassiExtractor  # noqa: E402
+from angeloni.html_extractor import HtmlProductExtractor as AngeloniHtmlExtractor  # noqa: E402
+from angeloni.product_extractor import ProductExtractor as AngeloniExtractor  # noqa: E402
+
+STORES = {
+    "giassi": ("giassi_config.yaml", GiassiExtractor, GiassiHtmlExtractor),
+    "angeloni": ("angeloni_config.yaml", AngeloniExtractor, AngeloniHtmlExtractor),
+}
+
+
+def best_time(fn: Callable[[], object], runs: int) -> Tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+async def browser_times(fixtures: List[Tuple[str, str, str]], runs: int) -> Dict[str, Tuple[float, list]]:
+    """
+    Time the Playwright extractor on each fixture. Returns {} if no browser is available.
+    """
+    from playwright.async_api import async_playwright
+
+    timings = {}
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch(headless=True)
+        except Exception as e:
+            print(f"Browser side skipped, Chromium is not available: {str(e).splitlines()[0]}")
+            return timings
+        page = await browser.new_page()
+        for label, store, html in fixtures:
+            config_file, extractor_class, _ = STORES[store]
+            extractor = extractor_class(ScraperConfig(config_file).current)
+            await page.set_content(html)
+            best, result = float("inf"), None
+            for _ in range(runs):
+                start = time.perf_counter()
+                result = await extractor.extract_all_products(page)
+                best = min(best, time.perf_counter() - start)
+            timings[label] = (best, result)
+        await browser.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshots", nargs="*", type=Path, help="saved results pages to include")
+    parser.add_argument("--products", type=int, default=200, help="products per generated fixture")
+    parser.add_argument("--runs", type=int, default=5, help="runs per engine and fixture (best is reported)")
+    args = parser.parse_args()
+
+    fixtures = [(f"{store} x{args.products}", store, build_fixture(store, args.products)) for store in STORES]
+    for path in args.snapshots:
+        store, _ = snapshot_info(path)
+        fixtures.append((path.name, store, path.read_text(encoding="utf-8")))
+
+    browser = asyncio.run(browser_times(fixtures, args.runs))
+
+    print(f"{'fixture':<40} {'products':>8} {'html ms':>9} {'browser ms':>11} {'speedup':>8}  same output")
+    for label, store, html in fixtures:
+        config_file, _, html_extractor_class = STORES[store]
+        extractor = html_extractor_class(ScraperConfig(config_file).current)
+        html_time, products = best_time(lambda: extractor.extract_all_products(html), args.runs)
+        if label in browser:
+            browser_time, browser_products = browser[label]
+            print(f"{label:<40} {len(products):>8} {html_time * 1000:>9.1f} {browser_time * 1000:>11.1f} "
+                  f"{browser_time / html_time:>7.0f}x  {products == browser_products}")
+        else:
+            print(f"{label:<40} {len(products):>8} {html_time * 1000:>9.1f} {'-':>11} {'-':>8}  -")
+
+
+if __name__ == "__main__":
+    main()
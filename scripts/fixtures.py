@@ -0,0 +1,49 @@
+"""
+Results pages shaped like each store's markup, shared by the developer scripts.
+"""
+from typing import Optional
+
+DEFAULT_PRODUCTS = {"giassi": "Arroz Tipo 1", "angeloni": "Feijão Carioca"}
+
+
+def giassi_card(i: int, product: str = DEFAULT_PRODUCTS["giassi"]) -> str:
+    return (
+        '<section class="vtex-search-result-3-x-galleryItem">'
+        f'<a href="/produto-{i}/p"><img src="/img/{i}.jpg" alt="">'
+        f'<span class="vtex-product-summary-2-x-productBrand">{product} Marca {i} 5kg</span></a>'
+        f'<div class="vtex-product-summary-2-x-price_sellingPrice"><span>R$ {20 + i % 30},{i % 100:02d}</span></div>'
+        f'<div class="giassi-apps-custom-0-x-priceTotalUnita">R$ {4 + i % 6},{i % 100:02d}/kg</div>'
+        '</section>'
+    )
+
+
+def angeloni_card(i: int, product: str = DEFAULT_PRODUCTS["angeloni"]) -> str:
+    return (
+        '<div class="vtex-search-result-3-x-galleryItem">'
+        f'<h3 class="vtex-product-summary-2-x-productBrand">{product} Marca {i} 1kg</h3>'
+        '<span class="vtex-product-price-1-x-sellingPriceValue">'
+        '<span class="vtex-product-price-1-x-currencyContainer">R$</span> '
+        f'<span class="vtex-product-price-1-x-currencyInteger">{5 + i % 12}</span>'
+        f'<span class="vtex-product-price-1-x-currencyFraction">{i % 100:02d}</span></span>'
+        + (f'<div class="angeloni-unitPrice">R$ {5 + i % 12},{i % 100:02d}/kg</div>' if i % 3 else "")
+        + '</div>'
+    )
+
+
+def build_fixture(store: str, products: int, product: Optional[str] = None, next_url: Optional[str] = None) -> str:
+    """
+    Build a results page with `products` product cards.
+
+    Args:
+        store: 'giassi' or 'angeloni'
+        products: Number of product cards
+        product: Product name the cards are named after (store default if None)
+        next_url: Target of a 'Mostrar mais' link, omitted if None
+    """
+    card = giassi_card if store == "giassi" else angeloni_card
+    cards = "".join(card(i, product or DEFAULT_PRODUCTS[store]) for i in range(products))
+    more = f'<a class="vtex-button" rel="next" href="{next_url}">Mostrar mais</a>' if next_url else ""
+    return (
+        "<!DOCTYPE html><html><head><title>Busca</title></head>"
+        f'<body><input type="text" placeholder="Pesquise ou Buscar produtos"><main>{cards}</main>{more}</body></html>'
+    )
@@ -0,0 +1,359 @@
+"""
+Load test the MCP server with simulated concurrent chat users.
+
+Starts the server (main.py) over streamable HTTP in a scratch directory,
+pointed at local fixture storefronts and a stub Nominatim geocoder served by
+this script, so no real site is hit. Each virtual user opens its own MCP
+session (with its own x-openwebui-user-id header, like Open WebUI) and
+replays a weighted mix of tool calls with random think time.
+
+Reports throughput, p50/p95/p99 latency and error rate per tool, plus the
+RSS and CPU of the server and its child processes (scraper workers and
+browsers, read from /proc, so Linux only).
+
+Usage:
+    uv run python scripts/load_test.py [--users 10] [--duration 60] [--json report.json]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import yaml
+from fastmcp import Client
+from fastmcp.client.transports import StreamableHttpTransport
+
+from fixtures import build_fixture
+
+ROOT = Path(__file__).resolve().parent.parent
+STORES = ("giassi", "angeloni")
+SEARCH_TERMS = ["arroz", "feijao", "leite", "cafe", "acucar", "oleo", "macarrao", "sabao"]
+ADDRESSES = ["Rua XV de Novembro, 100, Joinville", "Rua Blumenau, 500, Joinville", "Av. Santos Dumont, 1200, Joinville"]
+DEFAULT_MIX = "search_products=4,add_to_list=2,view_list=3,calculate_shopping_totals=1,find_nearest_supermarket=1"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves store-shaped search results pages under /<store>/<term>?page=N
+    (each page holding all products up to it, like the stores' 'Mostrar mais')
+    and Nominatim-style geocoding results under /search.
+    """
+
+    per_page = 12
+    pages = 4
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+
+        if parts == ["search"]:
+            # Deterministic coordinates around Joinville for any address
+            seed = int(hashlib.sha1(query.get("q", [""])[0].encode("utf-8")).hexdigest()[:8], 16)
+            place = {
+                "lat": str(-26.30 + (seed % 1000) / 10000),
+                "lon": str(-48.85 + (seed // 1000 % 1000) / 10000),
+                "display_name": query.get("q", [""])[0],
+            }
+            return self._send(200, json.dumps([place]), "application/json")
+
+        if not parts or parts[0] not in STORES:
+            return self._send(404, "")
+        time.sleep(self.latency)
+        store = parts[0]
+        if len(parts) == 1:
+            return self._send(200, build_fixture(store, 0))
+
+        term = parts[1]
+        page = max(1, int(query.get("page", ["1"])[0] or 1))
+        next_url = None
+        if page < self.pages:
+            next_query = "&".join(f"{key}={values[0]}" for key, values in query.items() if key != "page")
+            next_url = f"/{store}/{parts[1]}?{next_query}&page={page + 1}"
+        self._send(200, build_fixture(store, min(page, self.pages) * self.per_page, term.title(), next_url))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_fixture_configs(directory: Path, fixture_url: str) -> None:
+    """
+    Copy the store configs, pointing them at the fixture storefronts.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for store in STORES:
+        with open(ROOT / "config_loader" / f"{store}_config.yaml", encoding="utf-8") as file:
+            config = yaml.safe_load(file)
+        config["base_url"] = f"{fixture_url}/{store}/"
+        config.setdefault("search", {})["url_template"] = (
+            f"{fixture_url}/{store}/{{term}}?_q={{term}}&map=ft&page={{page}}&order={{order}}"
+        )
+        with open(directory / f"{store}_config.yaml", "w", encoding="utf-8") as file:
+            yaml.safe_dump(config, file, sort_keys=False, allow_unicode=True)
+
+
+class ProcessSampler:
+    """
+    Samples RSS and CPU of a process and all its descendants from /proc.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.samples: List[Dict[str, float]] = []
+        self._last: Optional[tuple] = None
+
+    @staticmethod
+    def _stat(pid: int) -> List[str]:
+        with open(f"/proc/{pid}/stat") as file:
+            # The command name may contain spaces; fields after it are space separated
+            return file.read().rsplit(")", 1)[1].split()
+
+    def _tree(self) -> List[int]:
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    children.setdefault(int(self._stat(int(entry))[1]), []).append(int(entry))
+                except (OSError, IndexError):
+                    continue
+        tree, stack = [], [self.pid]
+        while stack:
+            pid = stack.pop()
+            tree.append(pid)
+            stack.extend(children.get(pid, []))
+        return tree
+
+    def sample(self) -> None:
+        rss = cpu_ticks = 0
+        for pid in self._tree():
+            try:
+                fields = self._stat(pid)
+                with open(f"/proc/{pid}/statm") as file:
+                    rss += int(file.read().split()[1]) * self.page_size
+            except (OSError, IndexError):
+                continue
+            # utime + stime, plus reaped children's time for the server itself
+            cpu_ticks += int(fields[11]) + int(fields[12])
+            if pid == self.pid:
+                cpu_ticks += int(fields[13]) + int(fields[14])
+
+        now = time.monotonic()
+        cpu_seconds = cpu_ticks / self.clock_ticks
+        if self._last is not None:
+            elapsed = now - self._last[0]
+            cpu_pct = max(0.0, (cpu_seconds - self._last[1]) / elapsed * 100) if elapsed else 0.0
+            self.samples.append({"rss_mb": rss / 2**20, "cpu_pct": cpu_pct})
+        self._last = (now, cpu_seconds)
+
+    async def run(self, interval: float = 1.0) -> None:
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(interval)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {}
+        rss = [s["rss_mb"] for s in self.samples]
+        cpu = [s["cpu_pct"] for s in self.samples]
+        return {
+            "rss_mb_avg": round(sum(rss) / len(rss), 1),
+            "rss_mb_peak": round(max(rss), 1),
+            "cpu_pct_avg": round(sum(cpu) / len(cpu), 1),
+            "cpu_pct_peak": round(max(cpu), 1),
+        }
+
+
+def tool_arguments(tool: str, rng: random.Random) -> Dict[str, Any]:
+    term = rng.choice(SEARCH_TERMS)
+    if tool == "search_products":
+        return {"search_term": term, "top_k": 10}
+    if tool == "add_to_list":
+        store = rng.choice(["Giassi", "Angeloni"])
+        return {"unidades": str(rng.randint(1, 3)), "product_name": f"{term.title()} Marca {rng.randint(0, 11)}",
+                "store": store, "price": f"R$ {rng.randint(3, 30)},{rng.randint(0, 99):02d}"}
+    if tool == "find_nearest_supermarket":
+        return {"address": rng.choice(ADDRESSES)}
+    return {}
+
+
+def failed(tool: str, text: str) -> bool:
+    if text.startswith(("Error", "❌ Error")):
+        return True
+    return tool == "search_products" and "Search failed" in text
+
+
+async def virtual_user(index: int, url: str, mix: Dict[str, float], deadline: float, think_time: float,
+                       start_delay: float, records: List[tuple]) -> None:
+    rng = random.Random(index)
+    await asyncio.sleep(start_delay)
+    transport = StreamableHttpTransport(url, headers={"x-openwebui-user-id": f"load-user-{index}"})
+    async with Client(transport, timeout=120) as client:
+        tools, weights = list(mix), list(mix.values())
+        while time.monotonic() < deadline:
+            tool = rng.choices(tools, weights)[0]
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, tool_arguments(tool, rng), raise_on_error=False)
+                text = result.content[0].text if result.content else ""
+                error = result.is_error or failed(tool, text)
+            except Exception:
+                error = True
+            records.append((tool, time.perf_counter() - start, error))
+            await asyncio.sleep(rng.expovariate(1 / think_time) if think_time else 0)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+def build_report(records: List[tuple], elapsed: float, resources: Dict[str, float]) -> Dict[str, Any]:
+    per_tool = {}
+    for tool in sorted({record[0] for record in records}):
+        latencies = [latency for name, latency, _ in records if name == tool]
+        errors = sum(1 for name, _, error in records if name == tool and error)
+        per_tool[tool] = {
+            "calls": len(latencies),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "error_pct": round(errors / len(latencies) * 100, 1),
+        }
+    return {
+        "duration_s": round(elapsed, 1),
+        "calls": len(records),
+        "throughput_per_s": round(len(records) / elapsed, 2) if elapsed else 0.0,
+        "error_pct": round(sum(1 for r in records if r[2]) / len(records) * 100, 1) if records else 0.0,
+        "tools": per_tool,
+        "server": resources,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['calls']} calls in {report['duration_s']}s: "
+          f"{report['throughput_per_s']} calls/s, {report['error_pct']}% errors")
+    print(f"{'tool':<28} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for tool, stats in report["tools"].items():
+        print(f"{tool:<28} {stats['calls']:>6} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+              f"{stats['p99_ms']:>9} {stats['error_pct']:>6}%")
+    if report["server"]:
+        server = report["server"]
+        print(f"server RSS: avg {server['rss_mb_avg']} MB, peak {server['rss_mb_peak']} MB | "
+              f"CPU: avg {server['cpu_pct_avg']}%, peak {server['cpu_pct_peak']}%")
+
+
+async def run_load(args: argparse.Namespace, url: str, server_pid: int) -> Dict[str, Any]:
+    mix = {}
+    for entry in args.mix.split(","):
+        tool, weight = entry.split("=")
+        mix[tool.strip()] = float(weight)
+
+    sampler = ProcessSampler(server_pid)
+    sampler_task = asyncio.create_task(sampler.run())
+    records: List[tuple] = []
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    await asyncio.gather(*(
+        virtual_user(i, url, mix, deadline, args.think_time, args.ramp_up * i / args.users, records)
+        for i in range(args.users)
+    ))
+    elapsed = time.monotonic() - start
+    sampler_task.cancel()
+    return build_report(records, elapsed, sampler.summary())
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on port {port} within {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds between a user's calls")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="tool=weight list of calls to replay")
+    parser.add_argument("--store-latency", type=float, default=0.2, help="seconds each fixture page takes")
+    parser.add_argument("--workers", default=None, help="SCRAPER_WORKERS for the server")
+    parser.add_argument("--json", type=Path, default=None, help="also write the report to this file")
+    args = parser.parse_args()
+
+    FixtureHandler.latency = args.store_latency
+    fixtures = ThreadingHTTPServer(("127.0.0.1", free_port()), FixtureHandler)
+    threading.Thread(target=fixtures.serve_forever, daemon=True).start()
+    fixture_url = f"http://127.0.0.1:{fixtures.server_address[1]}"
+
+    with tempfile.TemporaryDirectory(prefix="grocery-load-") as workdir:
+        write_fixture_configs(Path(workdir) / "config", fixture_url)
+        port = free_port()
+        env = {
+            **os.environ,
+            "MCP_TRANSPORT": "http",
+            "MCP_PORT": str(port),
+            "SCRAPER_CONFIG_DIR": str(Path(workdir) / "config"),
+            "NOMINATIM_URL": fixture_url,
+        }
+        if args.workers is not None:
+            env["SCRAPER_WORKERS"] = args.workers
+
+        with open(Path(workdir) / "server.log", "w") as log:
+            server = subprocess.Popen([sys.executable, str(ROOT / "main.py")], cwd=workdir, env=env,
+                                      stdout=log, stderr=subprocess.STDOUT)
+            try:
+                wait_for_port(port, server)
+                print(f"Server pid {server.pid} on port {port}; fixtures at {fixture_url}; "
+                      f"{args.users} users for {args.duration:.0f}s")
+                report = asyncio.run(run_load(args, f"http://127.0.0.1:{port}/mcp/", server.pid))
+            finally:
+                server.terminate()
+                try:
+                    server.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+        fixtures.shutdown()
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure how long the MCP server takes to start.
+
+Reports the slowest imports of main.py (from `python -X importtime`) and the
+wall time from spawning the server over stdio until it answers tools/list.
+
+Usage:
+    uv run python scripts/profile_startup.py [--top 15] [--runs 3]
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastmcp import Client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times(top: int):
+    """
+    Import main.py in a fresh interpreter and return its slowest imports.
+
+    Returns:
+        Tuple of (total import time in ms, [(cumulative ms, module), ...])
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative) / 1000, name.rstrip()))
+
+    total = next((ms for ms, name in modules if name.strip() == "main"), 0.0)
+    modules = sorted((entry for entry in modules if entry[1].strip() != "main"), reverse=True)
+    return total, modules[:top]
+
+
+async def time_to_tools_list() -> float:
+    """
+    Spawn the server over stdio and time until tools/list returns.
+    """
+    start = time.perf_counter()
+    async with Client(str(ROOT / "main.py")) as client:
+        await client.list_tools()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="number of imports to show")
+    parser.add_argument("--runs", type=int, default=3, help="number of server spawns to time")
+    args = parser.parse_args()
+
+    total, modules = import_times(args.top)
+    print(f"import main: {total:.0f} ms")
+    for ms, name in modules:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    timings = [asyncio.run(time_to_tools_list()) for _ in range(args.runs)]
+    print(f"spawn to tools/list: best {min(timings) * 1000:.0f} ms, "
+          f"worst {max(timings) * 1000:.0f} ms over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
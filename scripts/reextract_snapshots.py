@@ -0,0 +1,51 @@
+"""
+Re-extract products from saved results page snapshots, without a browser.
+
+Uses the current selectors in config_loader/<store>_config.yaml, so a
+selector fix can be checked against pages saved before it (see the
+`snapshot_dir` config option).
+
+Usage:
+    uv run python scripts/reextract_snapshots.py [--limit N] snapshot.html [...]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config_loader import ScraperConfig  # noqa: E402
+from utils.snapshots import snapshot_info  # noqa: E402
+from giassi.html_extractor import HtmlProductExtractor as GiassiHtmlExtractor  # noqa: E402
+from angeloni.html_extractor import HtmlProductExtractor as AngeloniHtmlExtractor  # noqa: E402
+
+EXTRACTORS = {
+    "giassi": ("giassi_config.yaml", GiassiHtmlExtractor),
+    "angeloni": ("angeloni_config.yaml", AngeloniHtmlExtractor),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("snapshots", nargs="+", type=Path, help="snapshot files saved by the scrapers")
+    parser.add_argument("--limit", type=int, default=None, help="extract at most this many products per page")
+    args = parser.parse_args()
+
+    for path in args.snapshots:
+        store, search_term = snapshot_info(path)
+        config_file, extractor_class = EXTRACTORS[store]
+        extractor = extractor_class(ScraperConfig(config_file).current)
+        products = extractor.extract_all_products(path.read_text(encoding="utf-8"), args.limit)
+        print(json.dumps({
+            "snapshot": path.name,
+            "store": store,
+            "search_term": search_term,
+            "total_products": len(products),
+            "products": products,
+        }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
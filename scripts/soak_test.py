@@ -0,0 +1,177 @@
+"""
+Soak test the store scrapers for browser resource leaks.
+
+Runs many searches in this process with long-lived scrapers (one browser per
+store, as in a long-running server) against the local fixture storefronts of
+load_test.py, alternating limited and unlimited searches. After every search
+it checks that the store's browser context holds no open pages and that the
+store's ResourceTracker counts no live element handle. It then repeats the
+search's browser steps on a page it keeps open, where handles are not
+released by closing the page, and checks that they dispose every handle
+they created. It also samples the RSS of this
+process and its children (Playwright driver and browsers, read from /proc,
+so Linux only). Closing the scrapers at the end must leave no child process
+behind.
+
+Exits with status 1 when a leak is found, when RSS grows by more than
+--max-growth-mb after the warm-up searches, or when no search succeeded.
+
+Usage:
+    uv run python scripts/soak_test.py [--searches 200] [--max-growth-mb 60] [--json report.json]
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+from load_test import ROOT, SEARCH_TERMS, FixtureHandler, ProcessSampler, free_port, write_fixture_configs
+
+sys.path.insert(0, str(ROOT))
+
+from config_loader import ScraperConfig  # noqa: E402
+from utils.scraper_pool import create_scraper  # noqa: E402
+
+STORE_SPECS = {
+    "Giassi": ("giassi.scraper", "GiassiScraper", "giassi_config.yaml"),
+    "Angeloni": ("angeloni.scraper", "AngeloniScraper", "angeloni_config.yaml"),
+}
+
+
+async def handles_left_in_page(store: str, scraper: Any, term: str, limit: Any) -> int:
+    """
+    Run a scrape's browser steps on a page that stays open and return how many
+    of the handles they created were not disposed.
+    """
+    settings = scraper.config.current
+    manager = scraper.browser_manager
+    package = STORE_SPECS[store][0].rsplit(".", 1)[0]
+    extractor = importlib.import_module(f"{package}.product_extractor").ProductExtractor(settings, manager.resources)
+    page = await manager.new_page()
+    try:
+        baseline = manager.resources.stats()["live_handles"]
+        await extractor.search_products(page, term)
+        await extractor.load_all_products(page, term, limit)
+        await extractor.extract_all_products(page, limit)
+        return manager.resources.stats()["live_handles"] - baseline
+    finally:
+        await manager.close_page(page)
+
+
+async def soak(args: argparse.Namespace, config_dir: Path) -> Dict[str, Any]:
+    scrapers = {
+        store: create_scraper(spec, ScraperConfig(str(config_dir / spec[2])))
+        for store, spec in STORE_SPECS.items()
+    }
+    sampler = ProcessSampler(os.getpid())
+    sampler.sample()
+    leaks: List[Dict[str, Any]] = []
+    succeeded = failed = 0
+    baseline_mb = None
+
+    try:
+        for i in range(args.searches):
+            store = list(scrapers)[i % len(scrapers)]
+            term = SEARCH_TERMS[i // len(scrapers) % len(SEARCH_TERMS)]
+            limit = args.limit if i // len(scrapers) % 2 else None
+            results = await scrapers[store].scrape_products(term, limit)
+            if results.get("success"):
+                succeeded += 1
+            else:
+                failed += 1
+
+            resources = scrapers[store].resource_stats()
+            leak = {
+                "open_pages": resources["open_pages"],
+                "unclosed_pages": resources["pages_opened"] - resources["pages_closed"],
+                "live_handles": resources["live_handles"],
+            }
+            if results.get("success"):
+                try:
+                    leak["handles_left_in_page"] = await handles_left_in_page(store, scrapers[store], term, limit)
+                except Exception as e:
+                    print(f"Page check of {store} '{term}' failed: {e}")
+            if any(leak.values()):
+                leaks.append({"search": i, "store": store, "term": term, **resources, **leak})
+
+            if (i + 1) % args.sample_every == 0 or i + 1 == args.searches:
+                await asyncio.to_thread(sampler.sample)
+                rss_mb = sampler.samples[-1]["rss_mb"]
+                if baseline_mb is None and i + 1 >= args.warmup:
+                    baseline_mb = rss_mb
+                print(f"{i + 1:5d} searches  {succeeded} ok  {failed} failed  rss {rss_mb:.1f} MB")
+    finally:
+        final_resources = {store: scraper.resource_stats() for store, scraper in scrapers.items()}
+        for scraper in scrapers.values():
+            await scraper.close()
+
+    leftover = [pid for pid in sampler._tree() if pid != os.getpid()]
+    not_stopped = [store for store, scraper in scrapers.items() if scraper.browser_manager.playwright is not None]
+    rss = [sample["rss_mb"] for sample in sampler.samples]
+    growth = round(rss[-1] - baseline_mb, 1) if rss and baseline_mb is not None else 0.0
+
+    problems = []
+    if leaks:
+        problems.append(f"{len(leaks)} searches left pages or element handles open")
+    if growth > args.max_growth_mb:
+        problems.append(f"RSS grew {growth} MB after warm-up (limit {args.max_growth_mb} MB)")
+    if leftover or not_stopped:
+        problems.append(f"processes left after close: {leftover}, Playwright not stopped for {not_stopped}")
+    if not succeeded:
+        problems.append("no search succeeded")
+
+    return {
+        "searches": args.searches,
+        "succeeded": succeeded,
+        "failed": failed,
+        "rss_mb_baseline": round(baseline_mb, 1) if baseline_mb is not None else None,
+        "rss_mb_peak": round(max(rss), 1) if rss else None,
+        "rss_mb_growth": growth,
+        "resources": final_resources,
+        "leaks": leaks,
+        "problems": problems,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=200, help="searches to run, alternating stores")
+    parser.add_argument("--limit", type=int, default=20, help="limit of every other search (the rest are unlimited)")
+    parser.add_argument("--warmup", type=int, default=20, help="searches before the RSS baseline is taken")
+    parser.add_argument("--sample-every", type=int, default=10, help="searches between RSS samples")
+    parser.add_argument("--max-growth-mb", type=float, default=60.0, help="allowed RSS growth after warm-up")
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+
+    fixtures = ThreadingHTTPServer(("127.0.0.1", free_port()), FixtureHandler)
+    threading.Thread(target=fixtures.serve_forever, daemon=True).start()
+    fixture_url = f"http://127.0.0.1:{fixtures.server_address[1]}"
+
+    with tempfile.TemporaryDirectory(prefix="grocery-soak-") as workdir:
+        write_fixture_configs(Path(workdir) / "config", fixture_url)
+        # Session and asset caches go to the scratch directory
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            report = asyncio.run(soak(args, Path(workdir) / "config"))
+        finally:
+            os.chdir(cwd)
+    fixtures.shutdown()
+
+    print(json.dumps({key: value for key, value in report.items() if key != "leaks"}, indent=2))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if report["problems"]:
+        print("FAILED: " + "; ".join(report["problems"]))
+        sys.exit(1)
+    print("No leaks found")
+
+
+if __name__ == "__main__":
+    main()
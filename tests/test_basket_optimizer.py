@@ -0,0 +1,33 @@
+import asyncio
+
+from utils.basket_optimizer import find_offers, merge_quantities, parse_item
+
+
+class FakeSearchService:
+    def __init__(self, stores):
+        self.scrapers = {store: None for store in stores}
+        self.running = {store: 0 for store in stores}
+        self.peak = {store: 0 for store in stores}
+
+    async def search(self, store, term, user, limit=None):
+        self.running[store] += 1
+        self.peak[store] = max(self.peak[store], self.running[store])
+        await asyncio.sleep(0.01)
+        self.running[store] -= 1
+        return {"success": True, "products": [{"name": f"{term} marca", "price": "R$ 5,00"}]}
+
+
+def test_merge_quantities_sums_repeated_items():
+    items = [parse_item(item) for item in ["2 leite", "arroz", "Leite", "3x arroz"]]
+    assert merge_quantities(items) == {"leite": 3, "arroz": 4}
+
+
+def test_find_offers_searches_in_bounded_waves():
+    service = FakeSearchService(["Giassi", "Angeloni"])
+    terms = [f"item{i}" for i in range(15)]
+
+    offers = asyncio.run(find_offers(terms, service, concurrency=2))
+
+    assert list(offers) == terms
+    assert all(offer["Giassi"]["value"] == 5.0 for offer in offers.values())
+    assert service.peak == {"Giassi": 2, "Angeloni": 2}
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from utils.formatter import Formatter
+from utils.pagination import MIN_RESPONSE_CHARS, SearchCursor
+
+
+def store_results(store, count):
+    return {
+        "success": True,
+        "search_term": "leite",
+        "total_products": count,
+        "products": [
+            {"name": f"Leite {store} Integral {i} 1L", "price": "R$ 4,99", "unit_price": "R$ 4,99/l"}
+            for i in range(count)
+        ],
+    }
+
+
+STORES = ["Giassi", "Angeloni", "Bistek", "Fort"]
+
+
+@pytest.mark.parametrize("output", ["text", "compact", "json"])
+@pytest.mark.parametrize("max_chars", [MIN_RESPONSE_CHARS, 1500, 4000])
+def test_search_page_stays_within_max_chars(output, max_chars):
+    results = {store: store_results(store, 30) for store in STORES}
+    results["Fort"] = {
+        "success": False,
+        "search_term": "leite",
+        "error": "Timeout 30000ms exceeded.\n" + "  - waiting for locator\n" * 100,
+    }
+    cursor = SearchCursor("leite", output=output)
+
+    page = Formatter.format_search_page(results, cursor, max_chars)
+
+    assert len(page) <= max_chars
+
+
+def test_search_page_shares_budget_and_pages_through_the_rest():
+    results = {store: store_results(store, 30) for store in STORES[:2]}
+    cursor = SearchCursor("leite", output="json")
+
+    page = json.loads(Formatter.format_search_page(results, cursor, 1500))
+
+    shown = [len(page["stores"][store]["products"]) for store in STORES[:2]]
+    assert shown[0] > 0 and abs(shown[0] - shown[1]) <= 1
+    next_cursor = SearchCursor.decode(page["next_cursor"])
+    assert next_cursor.offsets == dict(zip(STORES[:2], shown))
+
+
+def test_search_page_shows_everything_that_fits():
+    results = {"Giassi": store_results("Giassi", 3)}
+
+    page = Formatter.format_search_page(results, SearchCursor("leite"), 8000)
+
+    assert "showing 1-3 of 3" in page
+    assert "cursor=" not in page
@@ -0,0 +1,17 @@
+from utils.list_repricer import prices_from_refresh
+
+
+def test_prices_from_refresh_takes_changed_prices_only():
+    outcomes = {
+        "Giassi": {
+            "status": "changed",
+            "changes": {
+                "changed": [{"name": "Leite Integral Tirol 1L", "old_price": "R$ 5,49", "new_price": "R$ 4,99"}],
+                "added": ["Leite Desnatado 1L"],
+                "removed": [],
+            },
+        },
+        "Angeloni": {"status": "unchanged"},
+    }
+
+    assert prices_from_refresh(outcomes) == {"Giassi": {"leite integral tirol 1l": "4,99"}}
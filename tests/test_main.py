@@ -0,0 +1,30 @@
+import asyncio
+
+import main
+
+
+def test_search_service_wait_does_not_block_event_loop(monkeypatch):
+    service = object()
+
+    def build():
+        with main._init_lock:
+            return service
+
+    monkeypatch.setattr(main, "_search_service", None)
+    monkeypatch.setattr(main, "get_search_service", build)
+
+    async def scenario():
+        ticks = 0
+        # The warm-up holds the init lock while it builds the scrapers
+        main._init_lock.acquire()
+        try:
+            waiter = asyncio.create_task(main.get_search_service_async())
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not waiter.done()
+        finally:
+            main._init_lock.release()
+        return ticks, await waiter
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 5)) == (5, service)
@@ -0,0 +1,36 @@
+import pytest
+
+from utils.price_calculator import parse_price, sum_prices_by_store
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("R$ 1.234,56", 1234.56),
+    ("R$ 16,07", 16.07),
+    ("10,90", 10.9),
+    ("10.90", 10.9),
+    ("4.5", 4.5),
+    ("1.234", 1234.0),
+    ("R$ 1.299.999,00", 1299999.0),
+    ("7", 7.0),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["", "R$ --", None])
+def test_parse_price_without_number(text):
+    assert parse_price(text) is None
+
+
+def test_sum_prices_by_store_uses_dot_and_comma_prices():
+    products = [
+        {"store": "Giassi", "price": "R$ 10,90", "unidades": "2"},
+        {"store": "Giassi", "price": "4.5", "unidades": "1"},
+        {"store": "Angeloni", "price": "R$ 1.234,56", "unidades": "1"},
+    ]
+
+    summary = sum_prices_by_store(products=products)
+
+    assert "Giassi: R$ 26,30" in summary
+    assert "Angeloni: R$ 1234,56" in summary
+    assert "Grand Total: R$ 1260,86" in summary
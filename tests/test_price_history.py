@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from utils.price_history import PriceHistory
+
+DAY = 86400
+
+
+@pytest.fixture
+def history(tmp_path):
+    return PriceHistory(str(tmp_path / "prices.db"), min_interval=3600)
+
+
+def product(price, name="Arroz Tio João 5kg"):
+    return {"name": name, "price": price, "unit_price": ""}
+
+
+def test_record_appends_only_changes_or_stale_prices(history):
+    now = int(time.time())
+
+    assert history.record("Giassi", [product("R$ 25,90"), product("R$ --", "Feijão 1kg")], ts=now) == 1
+    assert history.record("Giassi", [product("R$ 25,90")], ts=now + 60) == 0
+    assert history.record("Giassi", [product("R$ 24,90")], ts=now + 120) == 1
+    assert history.record("Giassi", [product("R$ 24,90")], ts=now + 120 + 3600) == 1
+    assert history.record("Angeloni", [product("R$ 24,90")], ts=now + 120) == 1
+
+
+def test_latest_prices_ignores_old_observations(history):
+    now = int(time.time())
+    history.record("Giassi", [product("R$ 25,90")], ts=now - 2 * DAY)
+    history.record("Giassi", [product("R$ 9,99", "Café 500g")], ts=now)
+
+    latest = history.latest_prices("Giassi", ["arroz tio joao 5kg", "cafe 500g"], max_age=DAY)
+
+    assert latest == {"cafe 500g": {"name": "Café 500g", "price": 9.99, "ts": now}}
+
+
+def test_find_products_matches_every_word(history):
+    history.record("Giassi", [product("R$ 25,90"), product("R$ 22,90", "Arroz Camil 5kg")])
+
+    matches = history.find_products("arroz tio")
+
+    assert [match["product_id"] for match in matches] == ["arroz tio joao 5kg"]
+
+
+@pytest.mark.parametrize("prices, direction", [
+    ([20.0, 21.0, 25.0], "rising"),
+    ([25.0, 24.0, 20.0], "falling"),
+    ([20.0, 20.2, 20.0], "stable"),
+])
+def test_trend_summarizes_the_window(history, prices, direction):
+    now = int(time.time())
+    for days_ago, price in zip([20, 10, 0], prices):
+        history.record("Giassi", [product(f"R$ {price:.2f}".replace(".", ","))], ts=now - days_ago * DAY)
+
+    trend = history.trend("Giassi", "arroz tio joao 5kg", days=30)
+
+    assert trend["direction"] == direction
+    assert (trend["min"], trend["max"], trend["current"]) == (min(prices), max(prices), prices[-1])
+    assert trend["observations"] == 3
+    assert [price for _, price in trend["points"]] == prices
+
+
+def test_trend_without_recent_observations(history):
+    history.record("Giassi", [product("R$ 25,90")], ts=int(time.time()) - 100 * DAY)
+
+    assert history.trend("Giassi", "arroz tio joao 5kg", days=90) is None
+    assert history.trend("Giassi", "unknown", days=90) is None
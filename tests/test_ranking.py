@@ -0,0 +1,28 @@
+import pytest
+
+from utils.ranking import parse_quantity, unit_price
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Leite Integral Tirol 1L", (1.0, "l")),
+    ("Arroz Tipo 1 Tio João 1,5kg", (1.5, "kg")),
+    ("Refrigerante Coca-Cola 2,5L", (2.5, "l")),
+    ("Água Mineral 2.5 L", (2.5, "l")),
+    ("Cerveja Lata 6 x 350ml", (2.1, "l")),
+    ("Cerveja 12x350ml", (4.2, "l")),
+    ("Café Torrado 500g", (0.5, "kg")),
+    ("Ovos Brancos 30 Unidades", (30.0, "un")),
+    ("Maminha Bovina Resfriada Kg", (1.0, "kg")),
+])
+def test_parse_quantity(name, expected):
+    amount, family = parse_quantity(name)
+    assert amount == pytest.approx(expected[0])
+    assert family == expected[1]
+
+
+def test_parse_quantity_without_size():
+    assert parse_quantity("Detergente Ypê Neutro") is None
+
+
+def test_unit_price_uses_decimal_pack_size():
+    assert unit_price({"name": "Arroz 1,5kg", "price": "R$ 9,00"}) == pytest.approx(6.0)
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from utils.resource_tracker import ResourceTracker
+
+
+class FakeHandle:
+    def __init__(self, page, value=None):
+        self.page = page
+        self.value = value
+        self.disposed = False
+        page.live += 1
+        page.peak = max(page.peak, page.live)
+
+    def as_element(self):
+        return self if self.value is not None else None
+
+    async def get_properties(self):
+        return self.value
+
+    async def dispose(self):
+        if not self.disposed:
+            self.disposed = True
+            self.page.live -= 1
+
+
+class FakePage:
+    """
+    A page whose selector matches `count` elements, tracking the handles alive in it.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.live = 0
+        self.peak = 0
+        self.closed = False
+
+    async def evaluate(self, script, selector):
+        return self.count
+
+    async def evaluate_handle(self, script, args):
+        _, start, stop = args
+        properties = {str(i - start): FakeHandle(self, i) for i in range(start, min(stop, self.count))}
+        properties["length"] = FakeHandle(self)
+        return FakeHandle(self, properties)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_map_elements_disposes_each_chunk():
+    page = FakePage(count=50)
+    tracker = ResourceTracker("Giassi", chunk_size=8)
+
+    values = asyncio.run(tracker.map_elements(page, ".product", lambda element: asyncio.sleep(0, element.value)))
+
+    assert values == list(range(50))
+    assert page.live == 0
+    assert page.peak <= 8 + 2
+    assert tracker.stats()["live_handles"] == 0
+    assert tracker.stats()["handles_disposed"] == 50
+
+
+def test_map_elements_respects_start_and_stop():
+    page = FakePage(count=50)
+    tracker = ResourceTracker(chunk_size=8)
+
+    values = asyncio.run(tracker.map_elements(page, ".product", lambda e: asyncio.sleep(0, e.value), 10, 20))
+
+    assert values == list(range(10, 20))
+    assert page.live == 0
+
+
+def test_chunk_is_disposed_when_fn_fails():
+    page = FakePage(count=20)
+    tracker = ResourceTracker(chunk_size=8)
+
+    async def fail(element):
+        raise RuntimeError("detached")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(tracker.map_elements(page, ".product", fail))
+
+    assert page.live == 0
+    assert tracker.stats()["live_handles"] == 0
+
+
+def test_undisposed_handles_count_as_live():
+    page = FakePage(count=0)
+    tracker = ResourceTracker()
+
+    kept = tracker.track(FakeHandle(page, 1))
+    released = tracker.track(FakeHandle(page, 2))
+    tracker.track(None)
+    asyncio.run(tracker.dispose([released, None]))
+
+    assert tracker.stats()["live_handles"] == 1
+    asyncio.run(tracker.dispose([kept]))
+    assert tracker.stats()["live_handles"] == 0
+
+
+def test_pages_are_counted_until_closed():
+    tracker = ResourceTracker()
+    page = tracker.page_opened(FakePage(count=0))
+
+    asyncio.run(tracker.close_page(page))
+
+    stats = tracker.stats()
+    assert page.closed
+    assert (stats["pages_opened"], stats["pages_closed"]) == (1, 1)
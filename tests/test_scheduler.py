@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from utils.scheduler import ScrapeScheduler, SchedulerBusy
+
+
+async def hold(scheduler, store, user, release, log=None):
+    async with scheduler.slot(store, user):
+        if log is not None:
+            log.append((user, store))
+        await release.wait()
+
+
+def test_global_cap():
+    scheduler = ScrapeScheduler(max_concurrent=2, per_store_limit=2)
+
+    async def run():
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(scheduler, store, "u", release)) for store in ["A", "B", "C"]]
+        await asyncio.sleep(0.01)
+        stats = scheduler.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert (stats["running"], stats["queue_depth"]) == (2, 1)
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["admitted"] == 3
+
+
+def test_per_store_cap_lets_other_stores_through():
+    scheduler = ScrapeScheduler(max_concurrent=4, per_store_limit=1)
+
+    async def run():
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(scheduler, store, "u", release)) for store in ["A", "A", "B"]]
+        await asyncio.sleep(0.01)
+        stats = scheduler.stats()
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats["running_by_store"] == {"A": 1, "B": 1}
+    assert stats["queue_depth"] == 1
+
+
+def test_users_are_served_round_robin():
+    scheduler = ScrapeScheduler(max_concurrent=1, per_store_limit=1)
+    log = []
+
+    async def run():
+        gate = asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, "A", "blocker", gate))
+        await asyncio.sleep(0.01)
+        # One user queues three scrapes before another user queues one
+        done = asyncio.Event()
+        done.set()
+        tasks = [asyncio.create_task(hold(scheduler, "A", "heavy", done, log)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(hold(scheduler, "A", "light", done, log)))
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(run())
+
+    assert [user for user, _ in log] == ["heavy", "light", "heavy", "heavy"]
+
+
+def test_full_queue_sheds_new_scrapes():
+    scheduler = ScrapeScheduler(max_concurrent=1, per_store_limit=1, max_queue=1)
+
+    async def run():
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(scheduler, "A", "u", release))
+        queued = asyncio.create_task(hold(scheduler, "A", "u", release))
+        await asyncio.sleep(0.01)
+        with pytest.raises(SchedulerBusy):
+            await hold(scheduler, "A", "v", release)
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(run())
+
+    assert scheduler.stats()["shed"] == 1
+    assert scheduler.stats()["admitted"] == 2
+
+
+def test_wait_over_max_wait_is_shed():
+    scheduler = ScrapeScheduler(max_concurrent=1, per_store_limit=1, max_wait=0.05)
+
+    async def run():
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(scheduler, "A", "u", release))
+        await asyncio.sleep(0.01)
+        with pytest.raises(SchedulerBusy):
+            await hold(scheduler, "A", "v", release)
+        stats = scheduler.stats()
+        release.set()
+        await running
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats["expired"] == 1
+    assert stats["queue_depth"] == 0
+    assert scheduler.stats()["running"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = ScrapeScheduler(max_concurrent=1, per_store_limit=1)
+
+    async def run():
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(scheduler, "A", "u", release))
+        waiting = asyncio.create_task(hold(scheduler, "A", "v", release))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        stats = scheduler.stats()
+        release.set()
+        await running
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert (stats["queue_depth"], stats["queued_users"]) == (0, 0)
+    assert scheduler.stats()["running"] == 0
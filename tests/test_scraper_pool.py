@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from utils.scraper_pool import ScraperPool
+
+# Workers import this module to build the scraper
+STORES = {"Giassi": ("test_scraper_pool", "SleepyScraper", "giassi_config.yaml")}
+
+
+class SleepyScraper:
+    """
+    Scraper whose search term is the number of seconds the scrape takes.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    async def scrape_products(self, search_term, limit=None, max_pages=None):
+        await asyncio.sleep(float(search_term))
+        return {"success": True, "search_term": search_term, "total_products": 0, "products": []}
+
+    def resource_stats(self):
+        return {}
+
+    async def close(self):
+        pass
+
+
+def test_cancelled_scrape_frees_its_worker():
+    pool = ScraperPool(STORES, workers=1)
+
+    async def run():
+        try:
+            # Start the worker process before timing anything
+            await pool.scrape("Giassi", "0")
+            slow = asyncio.create_task(pool.scrape("Giassi", "30"))
+            await asyncio.sleep(0.5)
+            slow.cancel()
+            started = time.monotonic()
+            results = await pool.scrape("Giassi", "0")
+            return results, time.monotonic() - started
+        finally:
+            await pool.close()
+
+    results, elapsed = asyncio.run(run())
+
+    assert results["success"]
+    assert elapsed < 5
+    assert pool.stats()["cancelled"] == 1
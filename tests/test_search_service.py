@@ -0,0 +1,205 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.scheduler import ScrapeScheduler
+from utils.search_service import SearchService
+
+
+class FakeScraper:
+    def __init__(self, delay, budget=1000, hedge_after=0):
+        self.config = SimpleNamespace(timeouts={"search_budget": budget, "hedge_after": hedge_after})
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+
+    async def scrape_products(self, search_term, limit=None, max_pages=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return {
+            "success": True,
+            "search_term": search_term,
+            "total_products": 1,
+            "products": [{"name": f"{search_term} marca", "price": "R$ 1,00", "unit_price": ""}],
+            "limit": limit,
+            "exhausted": True,
+        }
+
+    async def close(self):
+        pass
+
+
+def test_queue_time_does_not_count_against_budget():
+    scraper = FakeScraper(delay=0.2, budget=300)
+    service = SearchService({"Giassi": scraper}, ScrapeScheduler(per_store_limit=1))
+
+    async def run():
+        return await asyncio.gather(*(service.search("Giassi", f"item{i}") for i in range(4)))
+
+    results = asyncio.run(run())
+
+    assert all(result["success"] for result in results)
+    assert service.breakers["Giassi"].stats()["consecutive_failures"] == 0
+
+
+def test_slow_scrape_fails_its_budget():
+    scraper = FakeScraper(delay=0.5, budget=100)
+    service = SearchService({"Giassi": scraper}, ScrapeScheduler())
+
+    result = asyncio.run(service.search("Giassi", "leite"))
+
+    assert not result["success"]
+    assert service.breakers["Giassi"].stats()["consecutive_failures"] == 1
+
+
+def test_hedge_takes_a_scheduler_slot():
+    scraper = FakeScraper(delay=0.3, budget=5000, hedge_after=50)
+    service = SearchService({"Giassi": scraper}, ScrapeScheduler(per_store_limit=1))
+
+    result = asyncio.run(service.search("Giassi", "leite"))
+
+    assert result["success"]
+    assert scraper.peak == 1
+
+
+class PagedScraper:
+    """
+    Serves a fixed product list two products per page, tracking full scrapes and probes.
+    """
+
+    def __init__(self, products, probe_products=None):
+        self.config = SimpleNamespace(timeouts={"search_budget": 1000, "hedge_after": 0})
+        self.products = products
+        self.probe_products = probe_products
+        self.exhausted = True
+        self.full_scrapes = 0
+        self.probes = 0
+
+    async def scrape_products(self, search_term, limit=None, max_pages=None):
+        if max_pages:
+            self.probes += 1
+            products = self.products[:2] if self.probe_products is None else self.probe_products
+        else:
+            self.full_scrapes += 1
+            products = self.products
+        return {
+            "success": True,
+            "search_term": search_term,
+            "total_products": len(products),
+            "products": products,
+            "limit": limit,
+            "exhausted": self.exhausted,
+            "first_page_products": min(len(products), 2),
+        }
+
+    async def close(self):
+        pass
+
+
+PRODUCTS = [
+    {"name": "Leite Integral 1L", "price": "R$ 4,99", "unit_price": ""},
+    {"name": "Leite Desnatado 1L", "price": "R$ 5,29", "unit_price": ""},
+    {"name": "Leite Semidesnatado 1L", "price": "R$ 5,09", "unit_price": ""},
+]
+
+
+def refresh_after_search(scraper, **changes):
+    service = SearchService({"Giassi": scraper}, ScrapeScheduler())
+
+    async def run():
+        await service.search("Giassi", "leite")
+        for key, value in changes.items():
+            setattr(scraper, key, value)
+        return await service.refresh("Giassi", "leite")
+
+    return asyncio.run(run())
+
+
+def test_refresh_keeps_results_when_first_page_is_unchanged():
+    scraper = PagedScraper(PRODUCTS)
+
+    outcome = refresh_after_search(scraper)
+
+    assert outcome["status"] == "unchanged"
+    assert (scraper.full_scrapes, scraper.probes) == (1, 1)
+
+
+def test_refresh_rescrapes_when_a_price_changed():
+    scraper = PagedScraper(PRODUCTS)
+    repriced = [dict(PRODUCTS[0], price="R$ 4,49")] + PRODUCTS[1:]
+
+    outcome = refresh_after_search(scraper, products=repriced)
+
+    assert outcome["status"] == "changed"
+    assert scraper.full_scrapes == 2
+    assert outcome["changes"]["changed"] == [
+        {"name": "Leite Integral 1L", "old_price": "R$ 4,99", "new_price": "R$ 4,49"}
+    ]
+
+
+def test_refresh_rescrapes_after_an_empty_probe():
+    scraper = PagedScraper(PRODUCTS)
+
+    outcome = refresh_after_search(scraper, probe_products=[])
+
+    assert scraper.full_scrapes == 2
+    assert outcome["status"] == "unchanged"
+    assert outcome["results"]["products"] == PRODUCTS
+
+
+def test_refresh_rescrapes_after_a_shorter_probe():
+    scraper = PagedScraper(PRODUCTS)
+    removed = PRODUCTS[:1]
+
+    outcome = refresh_after_search(scraper, probe_products=removed, products=removed)
+
+    assert scraper.full_scrapes == 2
+    assert outcome["status"] == "changed"
+    assert outcome["changes"]["removed"] == ["Leite Desnatado 1L", "Leite Semidesnatado 1L"]
+
+
+def test_deadline_covers_queueing_and_returns_other_stores():
+    slow, fast = FakeScraper(delay=0.4, budget=5000), FakeScraper(delay=0.05, budget=5000)
+    service = SearchService(
+        {"Giassi": slow, "Angeloni": fast}, ScrapeScheduler(per_store_limit=1), deadline=0.3
+    )
+
+    async def run():
+        # The slow search holds Giassi's only slot, so the combined search queues behind it there
+        blocker = asyncio.create_task(service.search("Giassi", "arroz"))
+        await asyncio.sleep(0.01)
+        started = asyncio.get_running_loop().time()
+        results = await service.search_all("leite")
+        elapsed = asyncio.get_running_loop().time() - started
+        await blocker
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+
+    assert elapsed < 0.5
+    assert not results["Giassi"]["success"]
+    assert "did not respond within" in results["Giassi"]["error"]
+    assert results["Angeloni"]["success"]
+    assert all(breaker.stats()["consecutive_failures"] == 0 for breaker in service.breakers.values())
+
+
+def test_cursor_pages_through_limited_cached_results():
+    scraper = PagedScraper(PRODUCTS)
+    # The store has more products than the limited search loaded
+    scraper.exhausted = False
+    service = SearchService({"Giassi": scraper}, ScrapeScheduler())
+
+    async def run():
+        await service.search("Giassi", "leite", limit=3)
+        inside = await service.search("Giassi", "leite", offset=2)
+        full_scrapes = scraper.full_scrapes
+        past = await service.search("Giassi", "leite", offset=3)
+        return inside, full_scrapes, past
+
+    inside, full_scrapes, past = asyncio.run(run())
+
+    assert inside["limit"] == 3 and full_scrapes == 1
+    assert past["limit"] is None and scraper.full_scrapes == 2
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from utils.session_cache import SessionCache
+
+URL = "https://www.giassi.com.br/static/app.js"
+
+
+class FakeRoute:
+    def __init__(self, body=b"console.log(1)", resource_type="script"):
+        self.request = SimpleNamespace(url=URL, method="GET", resource_type=resource_type)
+        self.response = SimpleNamespace(status=200, headers={"content-type": "text/javascript", "content-length": "14"})
+        self.body = body
+        self.fetched = 0
+        self.fulfilled = None
+
+    async def fetch(self):
+        self.fetched += 1
+        response = self.response
+
+        async def body():
+            return self.body
+        response.body = body
+        return response
+
+    async def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+    async def continue_(self):
+        self.fulfilled = "continued"
+
+
+def test_assets_are_served_from_disk_after_first_fetch(tmp_path):
+    cache = SessionCache("giassi", {"cache_root": str(tmp_path)})
+
+    first, second = FakeRoute(), FakeRoute()
+    asyncio.run(cache.handle_route(first))
+    asyncio.run(cache.handle_route(second))
+
+    assert (first.fetched, second.fetched) == (1, 0)
+    assert second.fulfilled == {"status": 200, "headers": {"content-type": "text/javascript"}, "body": b"console.log(1)"}
+    assert not [path for path in cache.asset_dir.iterdir() if path.name.endswith(".tmp")]
+
+
+def test_expired_or_partial_assets_are_fetched_again(tmp_path):
+    cache = SessionCache("giassi", {"cache_root": str(tmp_path), "asset_max_age": 60})
+    cache.write_asset(URL, 200, {}, b"old")
+    body_path, meta_path = cache._asset_paths(URL)
+
+    stale = time.time() - 120
+    os.utime(body_path, (stale, stale))
+    assert cache.read_asset(URL) is None
+
+    cache.write_asset(URL, 200, {}, b"new")
+    meta_path.unlink()
+    assert cache.read_asset(URL) is None
+
+
+def test_documents_are_never_cached(tmp_path):
+    cache = SessionCache("giassi", {"cache_root": str(tmp_path)})
+    route = FakeRoute(resource_type="document")
+
+    asyncio.run(cache.handle_route(route))
+
+    assert route.fulfilled == "continued"
+    assert not list(cache.asset_dir.iterdir())
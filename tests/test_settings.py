@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from config_loader.settings import parse_settings
+
+CONFIG = Path(__file__).resolve().parent.parent / "config_loader" / "giassi_config.yaml"
+
+
+@pytest.fixture
+def settings():
+    return parse_settings(yaml.safe_load(CONFIG.read_text(encoding="utf-8")))
+
+
+@pytest.mark.parametrize("term, path, query", [
+    ("arroz", "/arroz", "_q=arroz"),
+    ("feijão 1/2 kg", "/feij%C3%A3o%201%2F2%20kg", "_q=feij%C3%A3o+1%2F2+kg"),
+    ("leite 50% off", "/leite%2050%25%20off", "_q=leite+50%25+off"),
+])
+def test_search_url_keeps_term_in_one_segment(settings, term, path, query):
+    url = settings.search_url(f" {term} ", page=2)
+    assert url == f"https://www.giassi.com.br{path}?{query}&map=ft&page=2"
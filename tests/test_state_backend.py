@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.product_list import ProductList
+from utils.result_cache import ResultCache
+from utils.state_backend import InMemoryBackend, LockTimeout, RedisBackend, create_backend
+
+
+def redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the lock's Lua script with it
+    return RedisBackend("redis://localhost:6379/0", client=fakeredis.FakeRedis(decode_responses=True))
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    return InMemoryBackend() if request.param == "memory" else redis_backend()
+
+
+def test_set_get_delete(backend):
+    backend.set("a", {"x": [1, "ç"]})
+    assert backend.get("a") == {"x": [1, "ç"]}
+    backend.delete("a")
+    assert backend.get("a") is None
+
+
+def test_ttl_expires(backend):
+    backend.set("a", 1, ttl=0.05)
+    assert backend.get("a") == 1
+    time.sleep(0.1)
+    assert backend.get("a") is None
+
+
+def test_lock_is_exclusive_until_released(backend):
+    token = backend.acquire_lock("scrape", ttl=5)
+    assert token is not None
+    assert backend.acquire_lock("scrape", ttl=5) is None
+    assert not backend.release_lock("scrape", "someone-else")
+    assert backend.release_lock("scrape", token)
+    assert backend.acquire_lock("scrape", ttl=5) is not None
+
+
+def test_locked_times_out(backend):
+    backend.acquire_lock("list", ttl=5)
+    with pytest.raises(LockTimeout):
+        with backend.locked("list", wait=0.05):
+            pass
+
+
+def test_held_lock_is_not_evicted_by_cached_results():
+    backend = InMemoryBackend(max_entries=2)
+    token = backend.acquire_lock("scrape:Giassi:leite", ttl=5)
+    for i in range(10):
+        backend.set(f"results:Giassi:item{i}", {"products": []}, ttl=60)
+    assert backend.acquire_lock("scrape:Giassi:leite", ttl=5) is None
+    assert backend.release_lock("scrape:Giassi:leite", token)
+
+
+def test_network_backend_runs_off_the_event_loop():
+    backend = redis_backend()
+    loop_thread = threading.get_ident()
+    assert asyncio.run(backend.run(threading.get_ident)) != loop_thread
+    assert asyncio.run(InMemoryBackend().run(threading.get_ident)) == loop_thread
+
+
+def test_result_cache_round_trip(backend):
+    cache = ResultCache(backend, ttl=60)
+
+    async def run():
+        await cache.put("Giassi", "Leite ", {"products": [{"name": "Leite"}]})
+        hit = await cache.get("Giassi", "leite")
+        await cache.delete("Giassi", "leite")
+        return hit, await cache.get("Giassi", "leite")
+
+    hit, miss = asyncio.run(run())
+    assert hit == {"products": [{"name": "Leite"}]}
+    assert miss is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_product_list_is_shared_through_the_backend(tmp_path):
+    backend = redis_backend()
+    first = ProductList(str(tmp_path / "list.json"), backend)
+    second = ProductList(str(tmp_path / "list.json"), backend)
+
+    first.add_product("2", "Leite Integral 1L", "Giassi", "4,99")
+    second.update_unidades("Leite Integral 1L", "3")
+
+    assert first.get_products() == [
+        {"unidades": "3", "name": "Leite Integral 1L", "store": "Giassi", "price": "4,99"}
+    ]
+    assert not (tmp_path / "list.json").exists()
+
+
+def test_create_backend():
+    assert isinstance(create_backend(""), InMemoryBackend)
+    with pytest.raises(ValueError):
+        create_backend("mongodb://localhost")
@@ -0,0 +1,176 @@
+import asyncio
+import re
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.price_calculator import parse_price
+from utils.ranking import MIN_RELEVANCE, score_product, tokenize
+
+QUANTITY_PREFIX = re.compile(r"^\s*(\d+)\s*x?\s+(\D.*)$")
+
+# Items looked up at once; each searches every store, so this stays within the scheduler's per-store limit
+LOOKUP_CONCURRENCY = 2
+# Products requested per store and item
+LOOKUP_LIMIT = 20
+
+
+def parse_item(item: str) -> Tuple[str, int]:
+    """
+    Split a shopping list entry into its search term and quantity.
+
+    Args:
+        item: Entry such as 'arroz 5kg', '2 leite integral' or '3x sabonete'
+
+    Returns:
+        Tuple of (search term, quantity)
+    """
+    match = QUANTITY_PREFIX.match(item)
+    if match:
+        return match.group(2).strip(), int(match.group(1))
+    return item.strip(), 1
+
+
+def merge_quantities(items: List[Tuple[str, int]]) -> Dict[str, int]:
+    """
+    Combine parsed items, summing the quantities of repeated search terms.
+
+    Args:
+        items: (search term, quantity) pairs from parse_item
+
+    Returns:
+        Quantity per search term, spelled as it first appeared
+    """
+    quantities: Dict[str, int] = {}
+    spelling: Dict[str, str] = {}
+    for term, quantity in items:
+        term = spelling.setdefault(term.lower(), term)
+        quantities[term] = quantities.get(term, 0) + quantity
+    return quantities
+
+
+async def find_offers(
+    terms: List[str],
+    search_service: Any,
+    user: str = "anonymous",
+    concurrency: int = LOOKUP_CONCURRENCY
+) -> Dict[str, Dict[str, Optional[Dict[str, Any]]]]:
+    """
+    Look up the best offer for each item in every store.
+
+    Items are searched in waves of `concurrency`, every store at once, so a
+    long list queues a few searches at a time instead of overflowing the
+    scheduler's queue (and its search budget) with all of them.
+
+    Args:
+        terms: Search terms of the items
+        search_service: SearchService used for the lookups
+        user: Caller identity used for fair scheduling
+        concurrency: Items searched at once
+
+    Returns:
+        Best offer per item and store ({item: {store: offer or None}})
+    """
+    stores = list(search_service.scrapers)
+
+    async def store_offers(term: str) -> Dict[str, Optional[Dict[str, Any]]]:
+        results = await asyncio.gather(
+            *(search_service.search(store, term, user, limit=LOOKUP_LIMIT) for store in stores)
+        )
+        return {
+            store: best_offer(result["products"], term) if result["success"] else None
+            for store, result in zip(stores, results)
+        }
+
+    offers = {}
+    for start in range(0, len(terms), concurrency):
+        wave = terms[start:start + concurrency]
+        offers.update(zip(wave, await asyncio.gather(*(store_offers(term) for term in wave))))
+    return offers
+
+
+def best_offer(products: List[Dict[str, str]], search_term: str) -> Optional[Dict[str, Any]]:
+    """
+    Pick the cheapest product that is relevant to the search.
+
+    Returns:
+        Dictionary with the product's name, price string and numeric price, or None
+    """
+    query_tokens = tokenize(search_term)
+    best = None
+    for product in products:
+        price = parse_price(product.get("price", ""))
+        if price is None or score_product(product, query_tokens) < MIN_RELEVANCE:
+            continue
+        if best is None or price < best["value"]:
+            best = {"name": product["name"], "price": product["price"], "value": price}
+    return best
+
+
+def optimize_basket(
+    offers: Dict[str, Dict[str, Optional[Dict[str, Any]]]],
+    quantities: Dict[str, int],
+    travel_costs: Optional[Dict[str, float]] = None,
+    max_stores: int = 2
+) -> List[Dict[str, Any]]:
+    """
+    Find the cheapest way to split a basket across stores.
+
+    Once the set of stores to visit is fixed, each item simply goes to the
+    cheapest of those stores, so every store set is solved exactly in one pass
+    over the items. With S stores and N items that is O(N * 2^S) work, which
+    stays in the milliseconds for any realistic list.
+
+    Args:
+        offers: Best offer per item and store ({item: {store: offer or None}})
+        quantities: Quantity per item
+        travel_costs: Cost of visiting each store (e.g. from distance), added once per store used
+        max_stores: Maximum number of stores to visit
+
+    Returns:
+        Plans for every store set, best first (fewest missing items, then lowest total).
+        Each plan has the stores, per-item assignments, missing items and costs.
+    """
+    travel_costs = travel_costs or {}
+    stores = sorted({store for store_offers in offers.values() for store in store_offers})
+    plans = []
+
+    for size in range(1, min(max_stores, len(stores)) + 1):
+        for store_set in combinations(stores, size):
+            assignments = {}
+            missing = []
+            products_cost = 0.0
+            for item, store_offers in offers.items():
+                choice = min(
+                    ((store, store_offers[store]) for store in store_set if store_offers.get(store)),
+                    key=lambda pair: pair[1]["value"],
+                    default=None
+                )
+                if choice is None:
+                    missing.append(item)
+                    continue
+                store, offer = choice
+                assignments[item] = {"store": store, **offer, "quantity": quantities.get(item, 1)}
+                products_cost += offer["value"] * quantities.get(item, 1)
+
+            used_stores = sorted({assignment["store"] for assignment in assignments.values()})
+            travel_cost = sum(travel_costs.get(store, 0.0) for store in used_stores)
+            plans.append({
+                "stores": used_stores or list(store_set),
+                "assignments": assignments,
+                "missing": missing,
+                "products_cost": round(products_cost, 2),
+                "travel_cost": round(travel_cost, 2),
+                "total": round(products_cost + travel_cost, 2),
+            })
+
+    plans.sort(key=lambda plan: (len(plan["missing"]), plan["total"], len(plan["stores"])))
+
+    # Keep one plan per distinct set of stores actually used
+    unique_plans = []
+    seen = set()
+    for plan in plans:
+        key = tuple(plan["stores"])
+        if key not in seen:
+            seen.add(key)
+            unique_plans.append(plan)
+    return unique_plans
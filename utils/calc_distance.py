@@ -1,6 +1,8 @@
+import os
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
 from typing import Dict, Optional, List
+from urllib.parse import urlsplit
 import yaml
 from pathlib import Path
 
@@ -17,8 +19,16 @@ class FindDistance:
         
         Args:
             user_agent: User agent string for the Nominatim geocoder
+        
+        The NOMINATIM_URL environment variable points geocoding at another
+        Nominatim-compatible server (e.g. a local stub in load tests).
         """
-        self.geolocator = Nominatim(user_agent=user_agent)
+        nominatim_url = os.environ.get("NOMINATIM_URL")
+        if nominatim_url:
+            url = urlsplit(nominatim_url)
+            self.geolocator = Nominatim(user_agent=user_agent, domain=url.netloc + url.path.rstrip("/"), scheme=url.scheme)
+        else:
+            self.geolocator = Nominatim(user_agent=user_agent)
         self.supermarkets = self._load_supermarkets()
     
     def _load_supermarkets(self) -> List[Dict[str, str]]:
@@ -98,3 +108,23 @@ class FindDistance:
         
         distances.sort(key=lambda x: x["distance_km"])
         return distances if distances else None
+
+    def distance_by_store(self, user_address: str, stores: List[str]) -> Dict[str, float]:
+        """
+        Find the distance to the nearest branch of each store chain.
+        
+        Args:
+            user_address: The user's address as a string
+            stores: Store chain names (e.g. ['Giassi', 'Angeloni'])
+            
+        Returns:
+            Distance in km to the closest branch per store; stores without a
+            located branch are left out
+        """
+        branches = self.find_closest_supermarket(user_address) or []
+        distances = {}
+        for store in stores:
+            nearest = next((b for b in branches if b["name"].lower().startswith(store.lower())), None)
+            if nearest:
+                distances[store] = nearest["distance_km"]
+        return distances
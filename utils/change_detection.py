@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any, Dict, List
+
+from utils.normalize import normalize_text
+
+
+def product_key(product: Dict[str, str]) -> str:
+    """
+    Identify a product within a store's results (the sites expose no stable id).
+    """
+    return normalize_text(product.get("name", ""))
+
+
+def fingerprint(products: List[Dict[str, str]]) -> str:
+    """
+    Fingerprint a result set by its products and their prices, ignoring order.
+    """
+    digest = hashlib.sha1()
+    for key, price in sorted((product_key(product), product.get("price", "")) for product in products):
+        digest.update(f"{key}\t{price}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def price_changes(old_products: List[Dict[str, str]], new_products: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Compare two result sets of the same search.
+
+    Returns:
+        Dictionary with the products whose price changed (name, old_price, new_price)
+        and the names of products that were added or removed
+    """
+    old = {product_key(product): product for product in old_products}
+    new = {product_key(product): product for product in new_products}
+    return {
+        "changed": [
+            {"name": product["name"], "old_price": old[key]["price"], "new_price": product["price"]}
+            for key, product in new.items()
+            if key in old and old[key].get("price") != product.get("price")
+        ],
+        "added": [product["name"] for key, product in new.items() if key not in old],
+        "removed": [product["name"] for key, product in old.items() if key not in new],
+    }
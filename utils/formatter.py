@@ -1,3 +1,12 @@
+import json
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils.pagination import SearchCursor
+from utils.price_calculator import parse_price
+
+
 class Formatter:
 
     @staticmethod
@@ -12,21 +21,312 @@ class Formatter:
             Formatted string with product information
         """
         if not results["success"]:
-            return f"Search failed for '{results['search_term']}':\nError: {results.get('error', 'Unknown error')}"
-            
-        response_text = f"Search Results for '{results['search_term']}':\n"
-        response_text += f"Total products found: {results['total_products']}\n\n"
+            return Formatter._format_failure(results)
+        
+        lines = [
+            f"Search Results for '{results['search_term']}':",
+            f"Total products found: {results['total_products']}",
+            "",
+        ]
         
         if results['total_products'] == 0:
-            response_text += "No products found for this search term."
-            return response_text
-            
-        for i, product in enumerate(results["products"], 1):
-            response_text += f"{i}. {product['name']}\n"
-            response_text += f" Price: {product['price']}\n"
-            if product['unit_price']:
-                response_text += f"Unit Price: {product['unit_price']}\n"
-            response_text += "\n"
-                
-        return response_text
-    
\ No newline at end of file
+            lines.append("No products found for this search term.")
+            return "\n".join(lines)
+        
+        lines.extend(
+            Formatter._format_product(i, product)
+            for i, product in enumerate(results["products"], 1)
+        )
+        return "\n".join(lines)
+    
+    @staticmethod
+    def format_search_page(results_by_store: Dict[str, dict], cursor: SearchCursor, max_chars: int = 8000) -> str:
+        """
+        Format one page of search results from several stores within a size budget.
+        
+        Products are shown in the order given (see utils.ranking.rank_results).
+        Each store shows at most `cursor.top_k` products starting at its cursor
+        offset. Products are added one store at a time, in turns, while the
+        whole response (store headers and the next page's cursor included)
+        stays within `max_chars`. When products remain, the output ends with
+        the cursor for the next page.
+        
+        Args:
+            results_by_store: Scraping results per store name
+            cursor: Query, ordering, page size, output mode and per-store offsets
+            max_chars: Maximum length of the response; store headers, errors (cut
+                       to their first line) and the cursor are always shown, so
+                       it must leave room for them (see MIN_RESPONSE_CHARS)
+            
+        Returns:
+            Formatted page in the cursor's output mode ('text', 'compact' or 'json')
+        """
+        render = Formatter._format_row if cursor.output == "compact" else Formatter._format_product
+        candidates = {}
+        for store, results in results_by_store.items():
+            if results["success"]:
+                start = cursor.offsets.get(store, 0)
+                candidates[store] = [
+                    {"n": i, "name": product["name"], "price": product["price"], "unit_price": product["unit_price"]}
+                    if cursor.output == "json" else render(i, product)
+                    for i, product in enumerate(results["products"][start:start + cursor.top_k], start + 1)
+                ]
+        
+        counts = {store: 0 for store in candidates}
+        response = Formatter._render_search_page(results_by_store, cursor, candidates, counts)
+        growing = [store for store in candidates if candidates[store]]
+        while growing:
+            for store in list(growing):
+                counts[store] += 1
+                attempt = Formatter._render_search_page(results_by_store, cursor, candidates, counts)
+                if len(attempt) <= max_chars:
+                    response = attempt
+                    if counts[store] == len(candidates[store]):
+                        growing.remove(store)
+                else:
+                    counts[store] -= 1
+                    growing.remove(store)
+        return response
+    
+    @staticmethod
+    def _render_search_page(results_by_store: Dict[str, dict], cursor: SearchCursor,
+                            candidates: Dict[str, list], counts: Dict[str, int]) -> str:
+        next_offsets = dict(cursor.offsets)
+        has_more = False
+        sections = []
+        json_stores = {}
+        
+        for store, results in results_by_store.items():
+            if not results["success"]:
+                # Browser errors carry a multi-line call log; the first line says what failed
+                error = (results.get("error") or "Unknown error").splitlines()[0][:200]
+                sections.append(f"=== {store} ===\n{Formatter._format_failure(dict(results, error=error))}")
+                json_stores[store] = {"error": error}
+                continue
+            
+            products = results["products"]
+            start = cursor.offsets.get(store, 0)
+            shown = candidates[store][:counts[store]]
+            end = start + len(shown)
+            next_offsets[store] = end
+            has_more = has_more or end < len(products)
+            
+            if cursor.output == "json":
+                json_stores[store] = {"total": len(products), "offset": start, "products": shown}
+                continue
+            
+            if not products:
+                body = "No products found for this search term."
+            elif start >= len(products):
+                body = f"No more products (all {len(products)} shown)."
+            elif not shown:
+                body = "More products did not fit in this response."
+            else:
+                body = "\n".join(shown).rstrip()
+            
+            header = f"=== {store} === '{cursor.search_term}': showing {start + 1}-{end} of {len(products)}"
+            if cursor.output == "compact" and shown:
+                header += "\n# | name | price | unit price"
+            sections.append(f"{header}\n{body}")
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = replace(cursor, offsets=next_offsets).encode()
+        
+        if cursor.output == "json":
+            return json.dumps(
+                {"search_term": cursor.search_term, "stores": json_stores, "next_cursor": next_cursor},
+                ensure_ascii=False,
+                separators=(",", ":")
+            )
+        
+        if next_cursor:
+            sections.append(f"More results available: call search_products with cursor=\"{next_cursor}\"")
+        return "\n\n".join(sections)
+    
+    @staticmethod
+    def format_basket(plans: List[dict], distances: Dict[str, float]) -> str:
+        """
+        Format basket optimization plans into a readable string.
+        
+        Args:
+            plans: Plans returned by optimize_basket, best first
+            distances: Distance in km to the nearest branch of each store
+            
+        Returns:
+            The best plan item by item, followed by the alternatives' totals
+        """
+        def brl(value: float) -> str:
+            return f"R$ {value:.2f}".replace('.', ',')
+        
+        if not plans:
+            return "Could not find any of these items in the supermarkets."
+        
+        best = plans[0]
+        lines = [f"🛒 Best plan: {' + '.join(best['stores'])}"]
+        for store in best["stores"]:
+            items = [(item, a) for item, a in best["assignments"].items() if a["store"] == store]
+            distance = f" ({distances[store]} km)" if store in distances else ""
+            lines.append(f"\n🏪 {store}{distance}:")
+            lines.extend(
+                f" - {a['quantity']}x {a['name']} ({item}): {a['price']}"
+                for item, a in items
+            )
+        if best["missing"]:
+            lines.append(f"\n❌ Not found: {', '.join(best['missing'])}")
+        
+        lines.append(f"\nProducts: {brl(best['products_cost'])}")
+        if best["travel_cost"]:
+            lines.append(f"Travel: {brl(best['travel_cost'])}")
+        lines.append(f"📊 Total: {brl(best['total'])}")
+        
+        if len(plans) > 1:
+            lines.append("\nAlternatives:")
+            for plan in plans[1:]:
+                missing = f", {len(plan['missing'])} items missing" if plan["missing"] else ""
+                lines.append(f" - {' + '.join(plan['stores'])}: {brl(plan['total'])}{missing}")
+        
+        return "\n".join(lines)
+    
+    @staticmethod
+    def format_refresh(search_term: str, outcomes: Dict[str, dict], max_changes: int = 10,
+                       list_updates: Optional[List[dict]] = None) -> str:
+        """
+        Format the outcome of revalidating a search's cached results.
+        
+        Args:
+            search_term: The refreshed search
+            outcomes: Refresh outcome per store, as returned by SearchService.refresh
+            max_changes: Maximum number of price changes listed per store
+            list_updates: Shopping list entries repriced with the changes (from ProductList.update_prices)
+            
+        Returns:
+            Per store whether results changed, with the price changes found
+            and the shopping list products they repriced
+        """
+        lines = [f"🔄 Refreshed '{search_term}':"]
+        for store, outcome in outcomes.items():
+            status = outcome["status"]
+            if status == "failed":
+                kept = ", cached results kept" if outcome["results"].get("success") else ""
+                lines.append(f"\n🏪 {store}: could not refresh ({outcome.get('error') or 'Unknown error'}){kept}")
+            elif status == "unchanged":
+                lines.append(f"\n🏪 {store}: unchanged, cached results are current")
+            elif status == "scraped":
+                lines.append(f"\n🏪 {store}: not cached yet, loaded {outcome['results']['total_products']} products")
+            else:
+                changes = outcome["changes"]
+                lines.append(
+                    f"\n🏪 {store}: updated (price changes: {len(changes['changed'])}, "
+                    f"new products: {len(changes['added'])}, removed: {len(changes['removed'])})"
+                )
+                lines.extend(
+                    f" - {change['name']}: {change['old_price']} → {change['new_price']}"
+                    for change in changes["changed"][:max_changes]
+                )
+                if len(changes["changed"]) > max_changes:
+                    lines.append(f" ... and {len(changes['changed']) - max_changes} more")
+        if list_updates:
+            lines.append(f"\n🛒 Updated {len(list_updates)} products in your shopping list (totals now use the new prices):")
+            lines.extend(
+                f" - {entry['name']} ({entry['store']}): R$ {entry['old_price']} → R$ {entry['new_price']}"
+                for entry in list_updates
+            )
+        return "\n".join(lines)
+    
+    @staticmethod
+    def format_repricing(report: List[dict]) -> str:
+        """
+        Format the outcome of repricing the shopping list.
+        
+        Args:
+            report: Entries returned by ProductList.update_prices
+            
+        Returns:
+            Price changes per product, products not found and the change in each store's total
+        """
+        def brl(value: float) -> str:
+            return f"R$ {value:.2f}".replace('.', ',')
+        
+        def quantity(entry: dict) -> float:
+            try:
+                return float(str(entry['unidades']).strip().split()[0].replace(',', '.'))
+            except (ValueError, IndexError):
+                return 1.0
+        
+        changed, missing = [], []
+        unchanged = 0
+        totals: Dict[str, List[float]] = {}
+        for entry in report:
+            old = parse_price(entry['old_price']) or 0.0
+            new = parse_price(entry['new_price']) if entry['new_price'] is not None else None
+            store_totals = totals.setdefault(entry['store'], [0.0, 0.0])
+            store_totals[0] += old * quantity(entry)
+            store_totals[1] += (new if new is not None else old) * quantity(entry)
+            if new is None:
+                missing.append(entry)
+            elif abs(new - old) >= 0.005:
+                changed.append((entry, old, new))
+            else:
+                unchanged += 1
+        
+        lines = [f"🔄 Repriced {len(report) - len(missing)} of {len(report)} products ({unchanged} unchanged)"]
+        if changed:
+            lines.append("\nPrice changes:")
+            lines.extend(
+                f" - {entry['name']} ({entry['store']}): {brl(old)} → {brl(new)} ({f'{new - old:+.2f}'.replace('.', ',')})"
+                for entry, old, new in changed
+            )
+        if missing:
+            lines.append("\n❌ Not found, price kept:")
+            lines.extend(f" - {entry['name']} ({entry['store']})" for entry in missing)
+        
+        lines.append("\n💰 Totals:")
+        for store, (old_total, new_total) in totals.items():
+            lines.append(f"🏪 {store}: {brl(old_total)} → {brl(new_total)}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _format_failure(results: dict) -> str:
+        return f"Search failed for '{results['search_term']}':\nError: {results.get('error', 'Unknown error')}"
+    
+    @staticmethod
+    def _format_product(i: int, product: dict) -> str:
+        lines = [f"{i}. {product['name']}", f" Price: {product['price']}"]
+        if product['unit_price']:
+            lines.append(f"Unit Price: {product['unit_price']}")
+        lines.append("")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _format_row(i: int, product: dict) -> str:
+        return f"{i} | {product['name']} | {product['price']} | {product['unit_price'] or '-'}"
+
+    @staticmethod
+    def format_price_trend(product: dict, trend: dict) -> str:
+        """
+        Format a product's price history summary into a readable string.
+        
+        Args:
+            product: Matched product with store and name
+            trend: Summary returned by PriceHistory.trend
+            
+        Returns:
+            Formatted string with min/avg/current price and the trend
+        """
+        def brl(value: float) -> str:
+            return f"R$ {value:.2f}".replace('.', ',')
+        
+        lines = [
+            f"📈 {product['name']} ({product['store']})",
+            f" Current: {brl(trend['current'])}",
+            f" Min: {brl(trend['min'])} | Avg: {brl(trend['avg'])} | Max: {brl(trend['max'])}",
+            f" Trend: {trend['direction']} ({trend['change_pct']:+.1f}%) over {trend['observations']} observations",
+        ]
+        if len(trend["points"]) > 1:
+            history = ", ".join(
+                f"{datetime.fromtimestamp(ts).strftime('%d/%m')}: {brl(price)}"
+                for ts, price in trend["points"]
+            )
+            lines.append(f" History: {history}")
+        return "\n".join(lines)
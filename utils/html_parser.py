@@ -0,0 +1,50 @@
+from typing import Any, List, Optional, Sequence
+
+
+def parse_html(html: str) -> Any:
+    """
+    Parse an HTML document for CSS selector queries.
+
+    Uses selectolax (Lexbor engine), an optional dependency installed with
+    `uv sync --extra html`.
+
+    Raises:
+        ImportError: If selectolax is not installed
+    """
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        raise ImportError("Offline HTML extraction needs selectolax: run `uv sync --extra html`")
+    return LexborHTMLParser(html)
+
+
+def text_content(node: Any) -> str:
+    """
+    Return a node's text like the DOM's textContent (all descendant text, unnormalized).
+    """
+    return node.text(deep=True, separator="", strip=False)
+
+
+def extract_text(node: Any, selectors: Sequence[str]) -> Optional[str]:
+    """
+    Extract the text of the first non-empty match, trying selectors in priority order.
+    Same rules as ElementUtils.extract_text on live elements.
+    """
+    for selector in selectors:
+        el = node.css_first(selector)
+        if el is not None:
+            text = text_content(el)
+            if text and text.strip():
+                return text.strip()
+    return None
+
+
+def find_elements(node: Any, selectors: Sequence[str]) -> List[Any]:
+    """
+    Return all matches of the first selector that matches anything.
+    """
+    for selector in selectors:
+        elements = node.css(selector)
+        if elements:
+            return elements
+    return []
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from utils.change_detection import product_key
+from utils.price_calculator import parse_price
+
+logger = logging.getLogger(__name__)
+
+# Products requested per lookup search; the item itself is usually among the first results
+LOOKUP_LIMIT = 20
+
+
+def format_price(value: float) -> str:
+    """
+    Format a price the way the shopping list stores it, without currency symbol (e.g. "11,50").
+    """
+    return f"{value:.2f}".replace('.', ',')
+
+
+def prices_from_refresh(outcomes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    Collect the new prices found by refreshing a search, to update listed products with.
+
+    Args:
+        outcomes: Refresh outcome per store, as returned by SearchService.refresh_all
+
+    Returns:
+        New price per store and product key in the list's format, for the products
+        whose price changed
+    """
+    prices: Dict[str, Dict[str, str]] = {}
+    for store, outcome in outcomes.items():
+        if outcome["status"] != "changed":
+            continue
+        for change in outcome["changes"]["changed"]:
+            price = parse_price(change["new_price"])
+            if price is not None:
+                prices.setdefault(store, {})[product_key(change)] = format_price(price)
+    return prices
+
+
+async def reprice_items(
+    items: List[Dict[str, str]],
+    search_service: Any,
+    price_history: Any = None,
+    user: str = "anonymous",
+    max_age: int = 600,
+    concurrency: int = 2
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up the current price of shopping list items in one batched pass.
+
+    Items are grouped by store and resolved, stores in parallel:
+    first from prices recorded in the last `max_age` seconds, then by searching
+    the store for the remaining items in waves of `concurrency` concurrent
+    searches (answered from the result cache when possible). Every search's
+    results are matched against all items still unresolved in that store, so
+    one search often reprices several items.
+
+    Args:
+        items: Shopping list entries with name, store and price
+        search_service: SearchService used for the lookups
+        price_history: PriceHistory consulted before searching
+        user: Caller identity used for fair scheduling
+        max_age: Seconds a recorded price is trusted without searching again
+        concurrency: Concurrent searches per store
+
+    Returns:
+        Current price per store and product key in the list's format (e.g. "11,50"),
+        for the items that were found
+    """
+    by_store: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for item in items:
+        by_store.setdefault(item.get("store", ""), {})[product_key(item)] = item
+
+    async def reprice_store(store: str, pending: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        found: Dict[str, str] = {}
+        if store not in search_service.scrapers:
+            return found
+
+        if price_history is not None:
+            try:
+                recorded = await asyncio.to_thread(price_history.latest_prices, store, list(pending), max_age)
+            except Exception as e:
+                logger.warning(f"Could not read recorded {store} prices: {e}")
+                recorded = {}
+            for key, observation in recorded.items():
+                found[key] = format_price(observation["price"])
+                del pending[key]
+
+        searched = set()
+        while pending:
+            wave = [key for key in pending if key not in searched][:concurrency]
+            if not wave:
+                break
+            searched.update(wave)
+            results = await asyncio.gather(
+                *(search_service.search(store, pending[key]["name"], user, LOOKUP_LIMIT) for key in wave)
+            )
+            for result in results:
+                for product in result.get("products", []):
+                    key = product_key(product)
+                    price = parse_price(product.get("price", ""))
+                    if key in pending and price is not None:
+                        found[key] = format_price(price)
+                        del pending[key]
+        return found
+
+    stores = list(by_store)
+    prices = await asyncio.gather(*(reprice_store(store, dict(by_store[store])) for store in stores))
+    return dict(zip(stores, prices))
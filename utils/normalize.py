@@ -0,0 +1,31 @@
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """
+    Lowercase text and strip accents, keeping punctuation (e.g. the "," of "1,5kg").
+
+    Args:
+        text: Text to fold (e.g. "Açúcar União 1,5kg")
+
+    Returns:
+        Folded text (e.g. "acucar uniao 1,5kg")
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return decomposed.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text, strip accents and collapse punctuation/whitespace to single spaces.
+
+    Args:
+        text: Text to normalize (e.g. "Açúcar Refinado União 1kg")
+
+    Returns:
+        Normalized text (e.g. "acucar refinado uniao 1kg")
+    """
+    return _NON_WORD.sub(" ", fold_text(text)).strip()
@@ -0,0 +1,64 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+OUTPUT_MODES = ("text", "compact", "json")
+
+# Smallest response size accepted: room for the store headers, errors and the next page's cursor
+MIN_RESPONSE_CHARS = 1000
+
+
+@dataclass
+class SearchCursor:
+    """
+    Position in a paginated search: the query, its filters, how results are
+    ordered and shown, and how many products of each store were already returned.
+    Encoded as an opaque string handed back to the caller.
+    """
+    search_term: str
+    sort_by: str = "relevance"
+    top_k: int = 20
+    output: str = "text"
+    offsets: Dict[str, int] = field(default_factory=dict)
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    unit: Optional[str] = None
+
+    def encode(self) -> str:
+        payload = {
+            "t": self.search_term,
+            "s": self.sort_by,
+            "k": self.top_k,
+            "f": self.output,
+            "o": self.offsets,
+            "min": self.min_price,
+            "max": self.max_price,
+            "u": self.unit,
+        }
+        raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "SearchCursor":
+        """
+        Rebuild a cursor from its encoded form.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return cls(
+                search_term=payload["t"],
+                sort_by=payload["s"],
+                top_k=int(payload["k"]),
+                output=payload["f"],
+                offsets={store: int(offset) for store, offset in payload["o"].items()},
+                min_price=payload.get("min"),
+                max_price=payload.get("max"),
+                unit=payload.get("u"),
+            )
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {e}")
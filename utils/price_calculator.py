@@ -1,21 +1,49 @@
 import json
 import logging
+import re
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
-def sum_prices_by_store(file_path: str = 'product_list.json') -> str:
+# Dots are thousands separators only before groups of exactly 3 digits ("1.234,56");
+# any other dot or comma is the decimal point ("10,90", "10.90", "4.5")
+PRICE_PATTERN = re.compile(r"(?P<integer>\d{1,3}(?:\.\d{3})+(?![\d.])|\d+)(?:[.,](?P<fraction>\d+))?")
+
+def parse_price(price_str: str) -> Optional[float]:
+    """
+    Extract the numeric value from a scraped price string.
+    
+    Args:
+        price_str: Price as shown on the site or typed by the user
+                   (e.g. "R$ 16,07", "R$ 1.299,90", "10,90", "10.90")
+        
+    Returns:
+        The price as a float, or None if no price could be found
+    """
+    if not price_str:
+        return None
+    match = PRICE_PATTERN.search(price_str)
+    if not match:
+        return None
+    integer = match.group("integer").replace('.', '')
+    fraction = match.group("fraction")
+    return float(f"{integer}.{fraction}" if fraction else integer)
+
+def sum_prices_by_store(file_path: str = 'product_list.json', products: Optional[List[Dict]] = None) -> str:
     """
     Sum the total price of products from the product list grouped by supermarket
     
     Args:
         file_path: Path to the product list JSON file
+        products: Products to sum instead of reading the file (e.g. from a shared state backend)
         
     Returns:
         Total prices separated by supermarket
     """
     try:
-        with open(file_path, 'r') as file:
-            products = json.load(file)
+        if products is None:
+            with open(file_path, 'r') as file:
+                products = json.load(file)
         
         store_totals = {}
         
@@ -24,9 +52,10 @@ def sum_prices_by_store(file_path: str = 'product_list.json') -> str:
             price_str = product.get('price', 'R$ 0,00')
             unidades_str = product.get('unidades', '1')
             
-            # Extract numeric value from price string (e.g., "R$ 16,07" -> 16.07)
-            price_clean = price_str.replace('R$', '').strip().replace(',', '.')
-            price_value = float(price_clean)
+            # Extract numeric value from price string (e.g., "R$ 16,07" -> 16.07, "R$ 1.299,90" -> 1299.9)
+            price_value = parse_price(price_str)
+            if price_value is None:
+                raise ValueError(f"invalid price '{price_str}' for {product.get('name')}")
             
             # Extract unidades value
             unidades = float(unidades_str.strip().split()[0])
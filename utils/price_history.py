@@ -0,0 +1,201 @@
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from utils.normalize import normalize_text
+from utils.price_calculator import parse_price
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    store TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    ts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prices_store_product_ts ON prices (store, product_id, ts);
+"""
+
+# Target number of points returned for a trend, whatever the history length
+MAX_TREND_POINTS = 30
+
+
+class PriceHistory:
+    """
+    Append-only time series of scraped prices stored in SQLite.
+
+    Products are identified by their normalized name within a store. An
+    observation is only appended when the price changed or the previous one
+    is older than `min_interval`, which keeps repeated scrapes compact.
+    """
+
+    def __init__(self, db_path: str = "price_history.db", min_interval: int = 3600):
+        """
+        Initialize the price history store.
+
+        Args:
+            db_path: Path to the SQLite database file
+            min_interval: Seconds before an unchanged price is recorded again
+        """
+        self.db_path = db_path
+        self.min_interval = min_interval
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def record(self, store: str, products: List[Dict[str, str]], ts: Optional[int] = None) -> int:
+        """
+        Append the prices of scraped products.
+
+        Args:
+            store: Store name (e.g. 'Giassi')
+            products: Product dictionaries as returned by the scrapers
+            ts: Observation time as a Unix timestamp (defaults to now)
+
+        Returns:
+            Number of observations appended
+        """
+        ts = ts or int(time.time())
+        rows = {}
+        for product in products:
+            price = parse_price(product.get("price", ""))
+            product_id = normalize_text(product.get("name", ""))
+            if price is None or not product_id:
+                continue
+            rows[product_id] = (store, product_id, product["name"], price, ts)
+
+        if not rows:
+            return 0
+
+        with closing(self._connect()) as conn, conn:
+            latest = {}
+            for product_id in rows:
+                row = conn.execute(
+                    "SELECT price, ts FROM prices WHERE store = ? AND product_id = ? "
+                    "ORDER BY ts DESC LIMIT 1",
+                    (store, product_id)
+                ).fetchone()
+                if row:
+                    latest[product_id] = row
+
+            new_rows = [
+                row for product_id, row in rows.items()
+                if product_id not in latest
+                or latest[product_id][0] != row[3]
+                or ts - latest[product_id][1] >= self.min_interval
+            ]
+            conn.executemany("INSERT INTO prices VALUES (?, ?, ?, ?, ?)", new_rows)
+
+        return len(new_rows)
+
+    def latest_prices(self, store: str, product_ids: List[str], max_age: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up the latest recorded price of several products of a store.
+
+        Args:
+            store: Store name
+            product_ids: Normalized product names
+            max_age: Only use observations at most this many seconds old
+
+        Returns:
+            Latest name, price and ts per product_id observed recently enough
+        """
+        if not product_ids:
+            return {}
+        since = int(time.time()) - max_age
+        placeholders = ", ".join("?" for _ in product_ids)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT product_id, name, price, MAX(ts) FROM prices "
+                f"WHERE store = ? AND product_id IN ({placeholders}) AND ts >= ? "
+                f"GROUP BY product_id",
+                (store, *product_ids, since)
+            ).fetchall()
+        return {r[0]: {"name": r[1], "price": r[2], "ts": r[3]} for r in rows}
+
+    def find_products(self, product_name: str, store: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find recorded products whose name contains every word of `product_name`.
+
+        Returns:
+            Matches with store, product_id and latest name, most observed first
+        """
+        tokens = normalize_text(product_name).split()
+        if not tokens:
+            return []
+
+        conditions = " AND ".join("product_id LIKE ?" for _ in tokens)
+        params: List[Any] = [f"%{token}%" for token in tokens]
+        if store:
+            conditions += " AND store = ?"
+            params.append(store)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT store, product_id, MAX(name), COUNT(*) AS n FROM prices "
+                f"WHERE {conditions} GROUP BY store, product_id "
+                f"ORDER BY (product_id = ?) DESC, n DESC LIMIT ?",
+                (*params, normalize_text(product_name), limit)
+            ).fetchall()
+
+        return [{"store": r[0], "product_id": r[1], "name": r[2], "observations": r[3]} for r in rows]
+
+    def trend(self, store: str, product_id: str, days: int = 90) -> Optional[Dict[str, Any]]:
+        """
+        Summarize a product's price over the last `days` days.
+
+        Long histories are downsampled to at most MAX_TREND_POINTS averaged buckets.
+
+        Returns:
+            Dictionary with min, avg, max, current, change_pct, direction and points,
+            or None if the product has no observations in the window
+        """
+        since = int(time.time()) - days * 86400
+        with closing(self._connect()) as conn:
+            summary = conn.execute(
+                "SELECT MIN(price), AVG(price), MAX(price), MIN(ts), MAX(ts), COUNT(*) FROM prices "
+                "WHERE store = ? AND product_id = ? AND ts >= ?",
+                (store, product_id, since)
+            ).fetchone()
+            if not summary or not summary[5]:
+                return None
+
+            min_price, avg_price, max_price, first_ts, last_ts, count = summary
+            bucket = max(86400, (last_ts - first_ts) // MAX_TREND_POINTS + 1)
+            points = conn.execute(
+                "SELECT MIN(ts), AVG(price) FROM prices "
+                "WHERE store = ? AND product_id = ? AND ts >= ? "
+                "GROUP BY (ts - ?) / ? ORDER BY 1",
+                (store, product_id, since, first_ts, bucket)
+            ).fetchall()
+            current = conn.execute(
+                "SELECT price FROM prices WHERE store = ? AND product_id = ? ORDER BY ts DESC LIMIT 1",
+                (store, product_id)
+            ).fetchone()[0]
+
+        first = points[0][1]
+        change_pct = (current - first) / first * 100 if first else 0.0
+        if change_pct > 2:
+            direction = "rising"
+        elif change_pct < -2:
+            direction = "falling"
+        else:
+            direction = "stable"
+
+        return {
+            "min": round(min_price, 2),
+            "avg": round(avg_price, 2),
+            "max": round(max_price, 2),
+            "current": round(current, 2),
+            "change_pct": round(change_pct, 1),
+            "direction": direction,
+            "observations": count,
+            "points": [(ts, round(price, 2)) for ts, price in points],
+        }
@@ -1,18 +1,40 @@
 import json
 import os
 import logging
-from typing import List, Dict
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+
+from utils.change_detection import product_key
+from utils.state_backend import StateBackend
 
 logger = logging.getLogger(__name__)
 
 class ProductList:
-    def __init__(self, file_path: str = "product_list.json"):
+    """
+    The shopping list, kept in a JSON file or, when several server workers
+    share state, in a state backend.
+    """
+
+    def __init__(self, file_path: str = "product_list.json", backend: Optional[StateBackend] = None):
+        """
+        Initialize the product list.
+
+        Args:
+            file_path: JSON file holding the list; also seeds a backend that has no list yet
+            backend: Shared state backend to keep the list in instead of the file
+        """
         self.file_path = file_path
+        self.backend = backend
+        self.key = "product_list"
     
     def _load_products(self) -> List[Dict]:
         """
-        Load product list from JSON file
+        Load product list from the backend or JSON file
         """
+        if self.backend is not None:
+            products = self.backend.get(self.key)
+            if products is not None:
+                return products
         if os.path.exists(self.file_path):
             try:
                 with open(self.file_path, 'r', encoding='utf-8') as f:
@@ -23,8 +45,11 @@ class ProductList:
     
     def _save_products(self, products: List[Dict]) -> None:
         """
-        Save product list to JSON file
+        Save product list to the backend or JSON file
         """
+        if self.backend is not None:
+            self.backend.set(self.key, products)
+            return
         try:
             with open(self.file_path, 'w', encoding='utf-8') as f:
                 json.dump(products, f, indent=2, ensure_ascii=False)
@@ -32,43 +57,92 @@ class ProductList:
             logger.error(f"Could not save product list: {e}")
             raise
 
+    @contextmanager
+    def _editing(self):
+        """
+        Serialize read-modify-write updates across workers sharing the backend.
+        """
+        if self.backend is None:
+            yield
+            return
+        with self.backend.locked(self.key):
+            yield
+
+    def get_products(self) -> List[Dict]:
+        """
+        Return the products in the list
+        """
+        return self._load_products()
+
     def add_product(self, unidades: str, product_name: str, store: str, price: str) -> str:
         """
         Add a product to the list
         """
-        products = self._load_products()
+        with self._editing():
+            products = self._load_products()
         
-        # Check if product already exists
-        for product in products:
-            if product.get('name') == product_name and product.get('store') == store:
-                return f"Product '{product_name}' from {store} is already in your list"
+            # Check if product already exists
+            for product in products:
+                if product.get('name') == product_name and product.get('store') == store:
+                    return f"Product '{product_name}' from {store} is already in your list"
         
-        # Add new product
-        new_product = {
-            'unidades': unidades,
-            'name': product_name,
-            'store': store,
-            'price': price
-        }
-        products.append(new_product)
-        self._save_products(products)
+            # Add new product
+            new_product = {
+                'unidades': unidades,
+                'name': product_name,
+                'store': store,
+                'price': price
+            }
+            products.append(new_product)
+            self._save_products(products)
 
-        return f"Added '{product_name}' from {store} (R$ {price}) to your list"
+            return f"Added '{product_name}' from {store} (R$ {price}) to your list"
     
     def remove_product(self, product_name: str) -> str:
         """
         Remove a product from the list
         """
-        products = self._load_products()
+        with self._editing():
+            products = self._load_products()
         
-        # Find and remove product
-        for i, product in enumerate(products):
-            if product.get('name') == product_name:
-                removed_product = products.pop(i)
-                self._save_products(products)
-                return f"Removed '{removed_product['name']}' from {removed_product['store']} from your list"
+            # Find and remove product
+            for i, product in enumerate(products):
+                if product.get('name') == product_name:
+                    removed_product = products.pop(i)
+                    self._save_products(products)
+                    return f"Removed '{removed_product['name']}' from {removed_product['store']} from your list"
+        
+            return f"Product '{product_name}' not found in your list"
+    
+    def update_prices(self, prices: Dict[str, Dict[str, str]]) -> List[Dict]:
+        """
+        Update the prices of listed products in one write
         
-        return f"Product '{product_name}' not found in your list"
+        Args:
+            prices: Current price per store and product key, without currency symbol
+                    like the stored prices (see utils.list_repricer)
+            
+        Returns:
+            One entry per listed product with its old and new price; new_price is
+            None for products that were not found
+        """
+        report = []
+        with self._editing():
+            products = self._load_products()
+            for product in products:
+                new_price = prices.get(product.get('store'), {}).get(product_key(product))
+                report.append({
+                    'name': product['name'],
+                    'store': product['store'],
+                    'unidades': product.get('unidades', '1'),
+                    'old_price': product['price'],
+                    'new_price': new_price
+                })
+                if new_price is not None:
+                    product['price'] = new_price
+            if any(entry['new_price'] is not None for entry in report):
+                self._save_products(products)
+        return report
     
     def view_products(self) -> str:
         """
@@ -90,14 +164,15 @@ class ProductList:
         """
         Update the unidades value for a product
         """
-        products = self._load_products()
+        with self._editing():
+            products = self._load_products()
         
-        # Find and update product
-        for product in products:
-            if product.get('name') == product_name:
-                old_unidades = product.get('unidades', 'N/A')
-                product['unidades'] = new_unidades
-                self._save_products(products)
-                return f"Updated '{product_name}' unidades from {old_unidades} to {new_unidades}"
+            # Find and update product
+            for product in products:
+                if product.get('name') == product_name:
+                    old_unidades = product.get('unidades', 'N/A')
+                    product['unidades'] = new_unidades
+                    self._save_products(products)
+                    return f"Updated '{product_name}' unidades from {old_unidades} to {new_unidades}"
         
-        return f"Product '{product_name}' not found in your list"
\ No newline at end of file
+            return f"Product '{product_name}' not found in your list"
\ No newline at end of file
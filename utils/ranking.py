@@ -0,0 +1,198 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.normalize import fold_text, normalize_text
+from utils.price_calculator import parse_price
+
+SORT_OPTIONS = ("relevance", "price", "unit_price")
+UNIT_OPTIONS = ("kg", "g", "l", "ml", "un")
+
+# Products scoring below this are dropped, unless that would drop every product
+MIN_RELEVANCE = 0.5
+# Score multiplier for products that look like a different category (see ranking.yaml)
+CATEGORY_PENALTY = 0.3
+
+STOPWORDS = {"de", "da", "do", "das", "dos", "e", "com", "para", "a", "o"}
+
+# Base unit family and multiplier for each size unit found in product names
+UNITS = {
+    "kg": ("kg", 1.0), "g": ("kg", 0.001), "mg": ("kg", 0.000001),
+    "l": ("l", 1.0), "lt": ("l", 1.0), "litro": ("l", 1.0), "litros": ("l", 1.0), "ml": ("l", 0.001),
+    "un": ("un", 1.0), "und": ("un", 1.0), "unid": ("un", 1.0), "unidades": ("un", 1.0),
+}
+QUANTITY_PATTERN = re.compile(
+    r"(?:(\d+)\s*x\s*)?(\d+(?:[.,]\d+)?)\s*(kg|mg|g|litros|litro|lt|ml|l|unidades|unid|und|un)\b"
+)
+
+
+@lru_cache(maxsize=1)
+def _category_penalties() -> Dict[str, Tuple[str, ...]]:
+    import yaml  # deferred: only needed once a search is ranked
+
+    config_path = Path(__file__).parent / "ranking.yaml"
+    with open(config_path, 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file) or {}
+    return {key: tuple(words) for key, words in (config.get("penalize") or {}).items()}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into accent-normalized tokens, dropping Portuguese stopwords.
+    """
+    return [token for token in normalize_text(text).split() if token not in STOPWORDS]
+
+
+def _token_matches(query_token: str, name_tokens: List[str]) -> bool:
+    for token in name_tokens:
+        if token == query_token:
+            return True
+        # Tolerate plurals and truncations ("ovos" vs "ovo", "refri" vs "refrigerante")
+        shorter, longer = sorted((token, query_token), key=len)
+        if len(shorter) >= 3 and longer.startswith(shorter):
+            return True
+    return False
+
+
+def parse_quantity(name: str) -> Optional[Tuple[float, str]]:
+    """
+    Extract the package size from a product name.
+
+    Args:
+        name: Product name (e.g. "Leite Integral Tirol 1L", "Cerveja 12x350ml")
+
+    Returns:
+        Tuple of (amount in the base unit, base unit family 'kg'/'l'/'un'), or None
+    """
+    # Keep decimal separators: "1,5kg" must not read as "1 5kg"
+    match = QUANTITY_PATTERN.search(fold_text(name))
+    if not match:
+        # Produce sold by weight is often named "... Kg" without an amount
+        return (1.0, "kg") if normalize_text(name).endswith(" kg") else None
+    count, amount, unit = match.groups()
+    family, factor = UNITS[unit]
+    total = float(amount.replace(",", ".")) * factor * (int(count) if count else 1)
+    return (total, family) if total > 0 else None
+
+
+def unit_price(product: Dict[str, str]) -> Optional[float]:
+    """
+    Price per kg, litre or unit computed from the product's price and package size.
+    """
+    price = parse_price(product.get("price", ""))
+    quantity = parse_quantity(product.get("name", ""))
+    if price is None or quantity is None:
+        return None
+    return price / quantity[0]
+
+
+def score_product(product: Dict[str, str], query_tokens: List[str]) -> float:
+    """
+    Score how well a product matches the search, between 0 and about 1.2.
+
+    The score is the share of query tokens found in the product name, with a
+    bonus when the name starts with the first query token and a penalty when
+    the name carries a category hint the query does not (see ranking.yaml).
+    """
+    if not query_tokens:
+        return 1.0
+    name_tokens = tokenize(product.get("name", ""))
+    if not name_tokens:
+        return 0.0
+
+    overlap = sum(_token_matches(token, name_tokens) for token in query_tokens) / len(query_tokens)
+    if _token_matches(query_tokens[0], name_tokens[:1]):
+        overlap += 0.2
+
+    penalties = _category_penalties()
+    for query_token in query_tokens:
+        for word in penalties.get(query_token, ()):
+            if word not in query_tokens and word in name_tokens:
+                return overlap * CATEGORY_PENALTY
+    return overlap
+
+
+def relevant_ratio(names: List[Optional[str]], search_term: str) -> float:
+    """
+    Share of product names that match the search well enough to be kept.
+    """
+    if not names:
+        return 0.0
+    query_tokens = tokenize(search_term)
+    relevant = sum(score_product({"name": name or ""}, query_tokens) >= MIN_RELEVANCE for name in names)
+    return relevant / len(names)
+
+
+def rank_products(
+    products: List[Dict[str, str]],
+    search_term: str,
+    sort_by: str = "relevance",
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    unit: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Filter and order scraped products for the search that produced them.
+
+    Args:
+        products: Product dictionaries as returned by the scrapers
+        search_term: The search the products came from
+        sort_by: 'relevance', 'price' (cheapest first) or 'unit_price' (cheapest per kg/l/un first)
+        min_price: Drop products cheaper than this
+        max_price: Drop products more expensive than this
+        unit: Keep only products sold by this unit family ('kg', 'g', 'l', 'ml' or 'un')
+
+    Returns:
+        A new list of the relevant products in the requested order. Products
+        without a price or size go last when sorting by price or unit price.
+    """
+    query_tokens = tokenize(search_term)
+    unit_family = UNITS[unit][0] if unit else None
+
+    candidates = []
+    for position, product in enumerate(products):
+        price = parse_price(product.get("price", ""))
+        if min_price is not None and (price is None or price < min_price):
+            continue
+        if max_price is not None and (price is None or price > max_price):
+            continue
+        if unit_family:
+            quantity = parse_quantity(product.get("name", ""))
+            if quantity is None or quantity[1] != unit_family:
+                continue
+        candidates.append((score_product(product, query_tokens), position, price, product))
+
+    relevant = [candidate for candidate in candidates if candidate[0] >= MIN_RELEVANCE]
+    if relevant:
+        candidates = relevant
+
+    if sort_by == "price":
+        candidates.sort(key=lambda c: (c[2] is None, c[2] or 0.0, c[1]))
+    elif sort_by == "unit_price":
+        unit_prices = {id(c[3]): unit_price(c[3]) for c in candidates}
+        candidates.sort(key=lambda c: (unit_prices[id(c[3])] is None, unit_prices[id(c[3])] or 0.0, c[1]))
+    else:
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    return [candidate[3] for candidate in candidates]
+
+
+def rank_results(results: Dict[str, Any], cursor) -> Dict[str, Any]:
+    """
+    Apply a search cursor's ordering and filters to one store's scraping results.
+
+    Returns:
+        A copy of the results with ranked products and an updated total
+    """
+    if not results.get("success"):
+        return results
+    products = rank_products(
+        results["products"],
+        cursor.search_term,
+        cursor.sort_by,
+        cursor.min_price,
+        cursor.max_price,
+        cursor.unit
+    )
+    return {**results, "products": products, "total_products": len(products)}
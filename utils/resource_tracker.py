@@ -0,0 +1,152 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Product cards held as element handles at once while extracting
+CHUNK_SIZE = 24
+
+_QUERY_SLICE = "([selector, start, stop]) => Array.from(document.querySelectorAll(selector)).slice(start, stop)"
+_COUNT = "selector => document.querySelectorAll(selector).length"
+
+
+async def count_elements(page: Any, selector: str) -> int:
+    """
+    Count the elements matching a CSS selector without creating element handles.
+    """
+    return await page.evaluate(_COUNT, selector)
+
+
+class ResourceTracker:
+    """
+    Accounts for the pages and element handles a store's browser context holds,
+    and releases them deterministically.
+
+    Every handle the scraper keeps across awaits is created or registered here
+    and disposed as soon as it is no longer needed, instead of living until its
+    page closes. Product cards are visited in chunks of `chunk_size`, so a long
+    results page never has all of its cards pinned in the browser and the
+    driver at once. Waits go through locators, which hold no handle.
+    Outside a scrape, `open_pages` and `live_handles` in the stats must be
+    zero; anything else is a leak (scripts/soak_test.py checks both). Handles
+    that never outlive the call creating them (ElementUtils.extract_text) are
+    released there and not counted.
+    """
+
+    def __init__(self, store: str = "", chunk_size: int = CHUNK_SIZE):
+        """
+        Initialize the tracker.
+
+        Args:
+            store: Store name used in log messages
+            chunk_size: Maximum number of card handles held at once
+        """
+        self.store = store
+        self.chunk_size = chunk_size
+        self.pages_opened = 0
+        self.pages_closed = 0
+        self.handles_created = 0
+        self.handles_disposed = 0
+        self.browser_launches = 0
+        self.launch_failures = 0
+
+    def page_opened(self, page: Any) -> Any:
+        self.pages_opened += 1
+        return page
+
+    async def close_page(self, page: Any) -> None:
+        """
+        Close a page opened through the tracker, releasing all of its handles.
+        """
+        try:
+            await page.close()
+        except Exception as e:
+            logger.warning(f"Could not close {self.store} page: {e}")
+        finally:
+            self.pages_closed += 1
+
+    def track(self, handle: Optional[Any]) -> Optional[Any]:
+        """
+        Register a handle created outside the tracker, to be released with dispose.
+        """
+        if handle is not None:
+            self.handles_created += 1
+        return handle
+
+    async def dispose(self, handles: Iterable[Optional[Any]]) -> None:
+        """
+        Release tracked handles in the browser. Handles of a page that was
+        closed meanwhile are already gone and still count as disposed.
+        """
+        for handle in handles:
+            if handle is None:
+                continue
+            try:
+                await handle.dispose()
+            except Exception:
+                pass
+            self.handles_disposed += 1
+
+    async def query_slice(self, page: Any, selector: str, start: int, stop: int) -> List[Any]:
+        """
+        Return handles to the matches of a CSS selector from index start up to stop.
+        """
+        array = await page.evaluate_handle(_QUERY_SLICE, [selector, start, stop])
+        try:
+            properties = await array.get_properties()
+        finally:
+            await array.dispose()
+
+        elements = []
+        for name, handle in properties.items():
+            element = handle.as_element() if name.isdigit() else None
+            if element is None:
+                await handle.dispose()
+                continue
+            elements.append((int(name), self.track(element)))
+        return [element for _, element in sorted(elements, key=lambda item: item[0])]
+
+    async def map_elements(self, page: Any, selector: str, fn: Callable[[Any], Awaitable[Any]],
+                           start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """
+        Apply fn to each element matching a CSS selector, in document order,
+        holding at most chunk_size handles at a time.
+
+        Args:
+            page: Page to query
+            selector: CSS selector of the elements
+            fn: Coroutine function called with each element handle
+            start: Index of the first element
+            stop: Index after the last element; all matches by default
+
+        Returns:
+            fn's results, in element order
+        """
+        total = await count_elements(page, selector)
+        stop = total if stop is None else min(stop, total)
+        results = []
+        for chunk_start in range(start, stop, self.chunk_size):
+            chunk = await self.query_slice(page, selector, chunk_start, min(chunk_start + self.chunk_size, stop))
+            try:
+                for element in chunk:
+                    results.append(await fn(element))
+            finally:
+                await self.dispose(chunk)
+        return results
+
+    def stats(self, context: Any = None) -> Dict[str, int]:
+        """
+        Return lifetime counters and what is currently held open.
+
+        Args:
+            context: Browser context whose open pages are counted
+        """
+        return {
+            "open_pages": len(context.pages) if context is not None else 0,
+            "live_handles": self.handles_created - self.handles_disposed,
+            "pages_opened": self.pages_opened,
+            "pages_closed": self.pages_closed,
+            "handles_disposed": self.handles_disposed,
+            "browser_launches": self.browser_launches,
+            "launch_failures": self.launch_failures,
+        }
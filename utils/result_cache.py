@@ -0,0 +1,62 @@
+from typing import Any, Dict, Optional
+
+from utils.normalize import normalize_text
+from utils.state_backend import InMemoryBackend, StateBackend
+
+
+class ResultCache:
+    """
+    Cache of store search results with a time-to-live, kept in a state backend.
+
+    Backs repeated searches and cursor pagination so that later pages of a
+    result set are served without scraping again. With a shared backend,
+    results scraped by one worker are served by all of them. Methods are
+    coroutines so network backends never block the event loop.
+    """
+
+    def __init__(self, backend: Optional[StateBackend] = None, ttl: int = 600):
+        """
+        Initialize the result cache.
+
+        Args:
+            backend: Where results are stored; defaults to an in-process backend
+            ttl: Seconds a store's results stay valid
+        """
+        self.backend = backend or InMemoryBackend(max_entries=256)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(store: str, search_term: str) -> str:
+        return f"results:{store}:{normalize_text(search_term)}"
+
+    async def get(self, store: str, search_term: str, count: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Return cached results for a store and term, or None if missing or expired.
+
+        Args:
+            count: Whether the lookup counts towards the hit/miss statistics
+        """
+        results = await self.backend.run(self.backend.get, self._key(store, search_term))
+        if count:
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return results
+
+    async def put(self, store: str, search_term: str, results: Dict[str, Any]) -> None:
+        """
+        Cache a store's results for a term.
+        """
+        await self.backend.run(self.backend.set, self._key(store, search_term), results, ttl=self.ttl)
+
+    async def delete(self, store: str, search_term: str) -> None:
+        """
+        Invalidate a store's cached results for a term.
+        """
+        await self.backend.run(self.backend.delete, self._key(store, search_term))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend.name, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerBusy(Exception):
+    """
+    Raised when a scrape is shed because the queue is full or its deadline passed.
+    """
+
+
+@dataclass
+class _Waiter:
+    store: str
+    user: str
+    enqueued_at: float
+    future: asyncio.Future = field(repr=False)
+
+
+class ScrapeScheduler:
+    """
+    Admission control for concurrent scrapes.
+
+    Caps the number of scrapes running globally and per store, queues the rest
+    in a bounded queue served round-robin across users, and sheds work that
+    cannot be admitted before its deadline.
+    """
+
+    def __init__(self, max_concurrent: int = 4, per_store_limit: int = 2,
+                 max_queue: int = 20, max_wait: float = 60.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Maximum scrapes running at once across all stores
+            per_store_limit: Maximum scrapes running at once against one store
+            max_queue: Maximum scrapes waiting for a slot before new ones are shed
+            max_wait: Seconds a scrape may wait in the queue before it is shed
+        """
+        self.max_concurrent = max_concurrent
+        self.per_store_limit = per_store_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._running = 0
+        self._running_by_store: Dict[str, int] = defaultdict(int)
+        # user -> pending waiters; dict order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._queue_depth = 0
+
+        self._admitted = 0
+        self._shed = 0
+        self._expired = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    @asynccontextmanager
+    async def slot(self, store: str, user: str = "anonymous"):
+        """
+        Hold a scrape slot for a store for the duration of the block.
+
+        Raises:
+            SchedulerBusy: If the queue is full or the wait exceeds max_wait
+        """
+        await self._acquire(store, user)
+        try:
+            yield
+        finally:
+            self._release(store)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of queue depth, running scrapes and wait times.
+        """
+        return {
+            "running": self._running,
+            "running_by_store": dict(self._running_by_store),
+            "queue_depth": self._queue_depth,
+            "queued_users": len(self._queues),
+            "admitted": self._admitted,
+            "shed": self._shed,
+            "expired": self._expired,
+            "avg_wait_ms": round(self._total_wait / self._admitted * 1000, 1) if self._admitted else 0.0,
+            "max_wait_ms": round(self._max_wait_seen * 1000, 1),
+        }
+
+    def _has_capacity(self, store: str) -> bool:
+        return (self._running < self.max_concurrent
+                and self._running_by_store[store] < self.per_store_limit)
+
+    def _start(self, store: str, enqueued_at: float) -> None:
+        self._running += 1
+        self._running_by_store[store] += 1
+        waited = time.monotonic() - enqueued_at
+        self._admitted += 1
+        self._total_wait += waited
+        self._max_wait_seen = max(self._max_wait_seen, waited)
+
+    async def _acquire(self, store: str, user: str) -> None:
+        if self._queue_depth >= self.max_queue:
+            self._shed += 1
+            logger.warning(f"Scrape queue full ({self._queue_depth}), shedding {store} request from {user}")
+            raise SchedulerBusy("The server is busy with other searches, please try again in a moment")
+
+        waiter = _Waiter(store, user, time.monotonic(), asyncio.get_running_loop().create_future())
+        self._queues.setdefault(user, deque()).append(waiter)
+        self._queue_depth += 1
+
+        self._dispatch()
+        if waiter.future.done():
+            return
+
+        try:
+            await asyncio.wait_for(waiter.future, timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just as we gave up; hand it to the next waiter
+                self._release(store)
+            else:
+                self._discard(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._expired += 1
+                logger.warning(f"{store} request from {user} waited over {self.max_wait}s, shedding")
+                raise SchedulerBusy("The server is busy with other searches, please try again in a moment")
+            raise
+
+    def _release(self, store: str) -> None:
+        self._running -= 1
+        self._running_by_store[store] -= 1
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.user)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            self._queue_depth -= 1
+            if not queue:
+                del self._queues[waiter.user]
+
+    def _dispatch(self) -> None:
+        """
+        Grant free slots to waiting scrapes, one user at a time in rotation.
+        """
+        while self._running < self.max_concurrent:
+            granted = False
+            for user, queue in self._queues.items():
+                waiter = next(
+                    (w for w in queue if not w.future.done() and self._has_capacity(w.store)),
+                    None
+                )
+                if waiter is None:
+                    continue
+
+                queue.remove(waiter)
+                self._queue_depth -= 1
+                if queue:
+                    self._queues.move_to_end(user)
+                else:
+                    del self._queues[user]
+
+                self._start(waiter.store, waiter.enqueued_at)
+                waiter.future.set_result(None)
+                granted = True
+                break
+
+            if not granted:
+                return
@@ -0,0 +1,246 @@
+import asyncio
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Store name -> (scraper module, scraper class, config file name)
+StoreSpec = Tuple[str, str, str]
+
+PRODUCT_FIELDS = ("name", "price", "unit_price")
+
+# Ids of the most recently cancelled jobs are kept in a ring of this many slots shared with the workers
+CANCEL_SLOTS = 64
+# Seconds between a worker's checks of whether its running scrape was cancelled
+CANCEL_POLL = 0.25
+
+# State of a worker process: its own event loop, one scraper (and browser) per store
+# and the pool's ring of cancelled job ids
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_scrapers: Dict[str, Any] = {}
+_cancelled_jobs: Any = None
+
+
+def create_scraper(spec: StoreSpec, config: Any) -> Any:
+    """
+    Instantiate a store scraper from its spec.
+
+    Args:
+        spec: (module, class, config file) of the store
+        config: ScraperConfig for the store
+    """
+    module_name, class_name, _ = spec
+    return getattr(importlib.import_module(module_name), class_name)(config)
+
+
+def encode_results(results: Dict[str, Any]) -> str:
+    """
+    Serialize scrape results compactly, with each product as a row of PRODUCT_FIELDS.
+    """
+    rows = [[product.get(field, "") for field in PRODUCT_FIELDS] for product in results.get("products", [])]
+    return json.dumps({**results, "products": rows}, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_results(raw: str) -> Dict[str, Any]:
+    """
+    Rebuild scrape results serialized by encode_results.
+    """
+    results = json.loads(raw)
+    results["products"] = [dict(zip(PRODUCT_FIELDS, row)) for row in results["products"]]
+    return results
+
+
+def _init_worker(stores: Dict[str, StoreSpec], cancelled_jobs: Any) -> None:
+    global _worker_loop, _cancelled_jobs
+    logging.basicConfig(level=logging.INFO)
+    from config_loader import ScraperConfig
+
+    _cancelled_jobs = cancelled_jobs
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    for store, spec in stores.items():
+        _worker_scrapers[store] = create_scraper(spec, ScraperConfig(spec[2]))
+    # Runs when the pool shuts the worker down (atexit handlers do not run in pool workers)
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker() -> None:
+    for store, scraper in _worker_scrapers.items():
+        try:
+            _worker_loop.run_until_complete(scraper.close())
+        except Exception as e:
+            logger.warning(f"Could not close {store} scraper: {e}")
+    # Cancel what the scrapers left running (e.g. a Playwright driver connection), as asyncio.run does
+    pending = asyncio.all_tasks(_worker_loop)
+    for task in pending:
+        task.cancel()
+    _worker_loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    _worker_loop.run_until_complete(_worker_loop.shutdown_asyncgens())
+    _worker_loop.close()
+
+
+async def _run_job(job_id: int, scraper: Any, search_term: str, limit: Optional[int],
+                   max_pages: Optional[int]) -> Dict[str, Any]:
+    """
+    Run a scrape, cancelling it (which closes its page) as soon as the pool
+    marks the job cancelled, so the worker is free for the next job.
+    """
+    task = asyncio.ensure_future(scraper.scrape_products(search_term, limit, max_pages))
+    while not task.done():
+        await asyncio.wait({task}, timeout=CANCEL_POLL)
+        if not task.done() and job_id in _cancelled_jobs[:]:
+            task.cancel()
+    try:
+        return task.result()
+    except asyncio.CancelledError:
+        return {"success": False, "error": "Scrape cancelled", "search_term": search_term,
+                "total_products": 0, "products": []}
+
+
+def _scrape_in_worker(job_id: int, store: str, config_version: int, search_term: str, limit: Optional[int],
+                      max_pages: Optional[int]) -> Tuple[str, int, Dict[str, Any]]:
+    scraper = _worker_scrapers[store]
+    # The server's ConfigWatcher already stats the file; reload only when it saw a change
+    if scraper.config.version != config_version:
+        try:
+            scraper.config.reload()
+        except (ValueError, FileNotFoundError) as e:
+            logger.error(f"Keeping previous configuration: {e}")
+    results = _worker_loop.run_until_complete(_run_job(job_id, scraper, search_term, limit, max_pages))
+    # Browser resources left open once the scrape is over, for leak detection in the parent
+    resources = {name: s.resource_stats() for name, s in _worker_scrapers.items()}
+    return encode_results(results), os.getpid(), resources
+
+
+class ScraperPool:
+    """
+    Pool of long-lived worker processes that run the store scrapers.
+
+    Each worker owns its own browsers and runs one scrape at a time, so
+    scraping and page parsing use other cores and never block the MCP event
+    loop. A crashed worker fails only the scrapes it was running; the pool is
+    then replaced on the next scrape.
+
+    A scrape that is cancelled after it started (e.g. on a search deadline)
+    is cancelled in its worker within CANCEL_POLL seconds, closing its page,
+    so the worker does not stay busy with a result nobody waits for.
+    """
+
+    def __init__(self, stores: Dict[str, StoreSpec], workers: int = 2):
+        """
+        Initialize the pool. Worker processes are started on the first scrape.
+
+        Args:
+            stores: Scraper spec per store name
+            workers: Number of worker processes
+        """
+        self.stores = stores
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Fresh interpreters: forking a process that runs an event loop and threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._cancelled_jobs = self._context.Array("q", CANCEL_SLOTS)
+        self.jobs = 0
+        self.cancelled = 0
+        self.crashes = 0
+        # Worker pid -> browser resource stats per store, as reported after its last scrape
+        self.resources: Dict[int, Dict[str, Any]] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self.stores, self._cancelled_jobs)
+            )
+        return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is executor:
+            self._executor = None
+            self.crashes += 1
+            self.resources.clear()
+            logger.error("A scraper worker process died, restarting the pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def scrape(self, store: str, search_term: str, limit: Optional[int] = None,
+                     max_pages: Optional[int] = None, config_version: int = 0) -> Dict[str, Any]:
+        """
+        Run a store's scrape in a worker process.
+
+        Args:
+            config_version: Version of the store's config the scrape should use
+                            (ScraperConfig.version); workers reload theirs on a mismatch
+
+        Raises:
+            RuntimeError: If the worker process died during the scrape
+        """
+        executor = self._get_executor()
+        self.jobs += 1
+        job_id = self.jobs
+        future = executor.submit(_scrape_in_worker, job_id, store, config_version, search_term, limit, max_pages)
+        try:
+            raw, pid, resources = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A queued job is dropped with its future; a running one is stopped by its worker
+            if not future.cancelled():
+                self.cancelled += 1
+                self._cancelled_jobs[job_id % CANCEL_SLOTS] = job_id
+            raise
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise RuntimeError(f"{store} scraper process crashed")
+        self.resources[pid] = resources
+        return decode_results(raw)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "jobs": self.jobs,
+            "cancelled": self.cancelled,
+            "crashes": self.crashes,
+            "resources": {str(pid): resources for pid, resources in self.resources.items()},
+        }
+
+    async def close(self) -> None:
+        """
+        Stop the worker processes, closing their browsers.
+        """
+        executor, self._executor = self._executor, None
+        self.resources.clear()
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+class PooledScraper:
+    """
+    Drop-in replacement for a store scraper that runs its scrapes in a ScraperPool.
+    """
+
+    def __init__(self, pool: ScraperPool, store: str, config: Any):
+        """
+        Initialize the scraper.
+
+        Args:
+            pool: Pool running the scrapes
+            store: Store name in the pool's specs
+            config: The store's ScraperConfig, read for timeouts by the search service
+        """
+        self.pool = pool
+        self.store = store
+        self.config = config
+
+    async def scrape_products(self, search_term: str, limit: Optional[int] = None,
+                              max_pages: Optional[int] = None) -> Dict[str, Any]:
+        return await self.pool.scrape(self.store, search_term, limit, max_pages, self.config.version)
+
+    async def close(self):
+        await self.pool.close()
@@ -0,0 +1,361 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from utils.change_detection import fingerprint, price_changes
+from utils.circuit_breaker import CircuitBreaker
+from utils.normalize import normalize_text
+from utils.price_history import PriceHistory
+from utils.result_cache import ResultCache
+from utils.scheduler import ScrapeScheduler, SchedulerBusy
+
+logger = logging.getLogger(__name__)
+
+
+class SearchService:
+    """
+    Runs store searches for the MCP tools.
+
+    Each store has one long-lived scraper whose browser is shared by all
+    searches (one page per search). Searches are admitted by the scheduler,
+    guarded by a per-store circuit breaker and, once admitted, bounded by the
+    store's `search_budget`; only a scrape that exceeds its budget counts as a
+    store failure. Every search also has an overall `deadline`, queueing
+    included: a store that has not answered by then is reported as timed out
+    and the other stores' results are returned without it.
+
+    Identical searches are deduplicated through a lock in the result cache's
+    state backend: while one search (in this or, with a shared backend,
+    another worker) scrapes a term, the others wait for its cached results.
+    """
+
+    DEDUP_POLL = 0.25  # seconds between checks for a concurrent scrape's results
+
+    def __init__(self, scrapers: Dict[str, Any], scheduler: ScrapeScheduler,
+                 price_history: Optional[PriceHistory] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 deadline: float = 90.0):
+        """
+        Initialize the search service.
+
+        Args:
+            scrapers: Scraper instance per store name (e.g. {'Giassi': GiassiScraper(...)})
+            scheduler: Scheduler that admits concurrent scrapes
+            price_history: Store that every successfully scraped price is appended to
+            result_cache: Cache of recent results, used before scraping again;
+                          its state backend also holds the in-flight scrape locks
+            deadline: Seconds a store search may take from request to results,
+                      waiting for a slot or a concurrent identical search included
+        """
+        self.scrapers = scrapers
+        self.scheduler = scheduler
+        self.price_history = price_history
+        self.result_cache = result_cache or ResultCache()
+        self.backend = self.result_cache.backend
+        self.breakers = {store: CircuitBreaker(store) for store in scrapers}
+        self.deadline = deadline
+        self._scrapes = 0
+        self._pages_loaded = 0
+        self._deduplicated = 0
+        self._probes = 0
+        self._unchanged = 0
+
+    @staticmethod
+    def _failure(search_term: str, error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": error,
+            "search_term": search_term,
+            "total_products": 0,
+            "products": []
+        }
+
+    async def search_all(self, search_term: str, user: str = "anonymous", limit: Optional[int] = None,
+                         offsets: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Search every store concurrently.
+
+        Args:
+            offsets: Per store, the position a paginated caller continues from (see search)
+
+        Returns:
+            Results dictionary per store name, in scraper order
+        """
+        results = await asyncio.gather(
+            *(self.search(store, search_term, user, limit, offsets.get(store, 0) if offsets is not None else None)
+              for store in self.scrapers)
+        )
+        return dict(zip(self.scrapers, results))
+
+    async def search(self, store: str, search_term: str, user: str = "anonymous",
+                     limit: Optional[int] = None, offset: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Search one store, answering from the result cache when possible and
+        failing fast when its circuit is open.
+        
+        Args:
+            store: Store name
+            search_term: Product to search for
+            user: Caller identity used for fair scheduling
+            limit: Stop once this many products are found; None stops when new
+                   result pages are no longer relevant
+            offset: Position a paginated caller continues from; cached results
+                    holding products past it answer the search even if limited
+        """
+        cached = await self.result_cache.get(store, search_term)
+        if cached is not None and (
+            self._covers(cached, limit) or (offset is not None and offset < cached["total_products"])
+        ):
+            return cached
+        return await self._scrape(store, search_term, user, limit)
+
+    async def refresh_all(self, search_term: str, user: str = "anonymous") -> Dict[str, Dict[str, Any]]:
+        """
+        Revalidate every store's cached results for a term concurrently.
+
+        Returns:
+            Refresh outcome per store name, in scraper order (see refresh)
+        """
+        outcomes = await asyncio.gather(
+            *(self.refresh(store, search_term, user) for store in self.scrapers)
+        )
+        return dict(zip(self.scrapers, outcomes))
+
+    async def refresh(self, store: str, search_term: str, user: str = "anonymous") -> Dict[str, Any]:
+        """
+        Revalidate a store's cached results for a term with a first-page probe.
+
+        When the probe returns as many products as the cached results had on
+        their first page, with the same names and prices, the cache entry is
+        kept and its ttl renewed. Otherwise it is invalidated and the store
+        scraped in full, so rankings, totals and matches built from it
+        afterwards use the new results. An empty probe proves nothing (the
+        site may have returned an empty or broken page), so it is re-scraped too.
+
+        Returns:
+            Dictionary with the status ('unchanged', 'changed', 'scraped' when
+            nothing was cached, or 'failed'), the current results, the price
+            changes against the cached results when changed, and any error
+        """
+        cached = await self.result_cache.get(store, search_term)
+        if cached is None:
+            results = await self.search(store, search_term, user)
+            status = "scraped" if results.get("success") else "failed"
+            return {"status": status, "results": results, "changes": None, "error": results.get("error")}
+
+        probe = await self._scrape(store, search_term, user, cached.get("limit"), max_pages=1)
+        if not probe.get("success"):
+            return {"status": "failed", "results": cached, "changes": None, "error": probe.get("error")}
+
+        self._probes += 1
+        if self._probe_matches(cached, probe):
+            self._unchanged += 1
+            await self.result_cache.put(store, search_term, cached)
+            return {"status": "unchanged", "results": cached, "changes": None, "error": None}
+
+        # Invalidate first so concurrent searches wait for the new scrape instead of serving the stale entry
+        await self.result_cache.delete(store, search_term)
+        results = await self._scrape(store, search_term, user, cached.get("limit"))
+        if not results.get("success"):
+            await self.result_cache.put(store, search_term, cached)
+            return {"status": "failed", "results": cached, "changes": None, "error": results.get("error")}
+        changed = fingerprint(results["products"]) != fingerprint(cached["products"])
+        return {
+            "status": "changed" if changed else "unchanged",
+            "results": results,
+            "changes": price_changes(cached["products"], results["products"]) if changed else None,
+            "error": None
+        }
+
+    @staticmethod
+    def _probe_matches(cached: Dict[str, Any], probe: Dict[str, Any]) -> bool:
+        """
+        Whether a first-page probe shows the same products and prices as the
+        first page of the cached results. Entries cached without their first
+        page size are compared in full.
+        """
+        products = probe["products"]
+        expected = min(cached.get("first_page_products", len(cached["products"])), len(cached["products"]))
+        if not products or len(products) != expected:
+            return False
+        return fingerprint(products) == fingerprint(cached["products"][:expected])
+
+    async def _scrape(self, store: str, search_term: str, user: str, limit: Optional[int],
+                      max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Scrape a store within its budget, failing fast when its circuit is open.
+
+        Full scrapes are deduplicated, cached and recorded in the price history.
+        A probe (max_pages set) is run as is: its partial results are only returned.
+        """
+        breaker = self.breakers[store]
+        if breaker.state == CircuitBreaker.OPEN:
+            return self._failure(search_term, f"{store} is temporarily unavailable, skipping it for now")
+
+        try:
+            if max_pages is None:
+                search = self._deduplicated_search(store, search_term, user, limit)
+            else:
+                search = self._probe(store, search_term, user, limit, max_pages)
+            results, scraped = await asyncio.wait_for(search, timeout=self.deadline)
+        except SchedulerBusy as e:
+            return self._failure(search_term, str(e))
+        except asyncio.TimeoutError:
+            # Queueing or a cut-short scrape is not the store's fault: the breaker is left alone
+            logger.warning(f"{store} search for '{search_term}' missed the {self.deadline:.0f}s deadline")
+            return self._failure(search_term, f"{store} did not respond within {self.deadline:.0f}s")
+        except Exception as e:
+            breaker.record_failure()
+            logger.error(f"{store} search error: {e}")
+            return self._failure(search_term, str(e))
+
+        if not results.get("success") or not scraped:
+            return results
+
+        self._scrapes += 1
+        self._pages_loaded += results.get("pages_loaded", 0)
+        if self.price_history:
+            try:
+                await asyncio.to_thread(self.price_history.record, store, results["products"])
+            except Exception as e:
+                logger.warning(f"Could not record {store} prices: {e}")
+        return results
+
+    @staticmethod
+    def _covers(cached: Dict[str, Any], limit: Optional[int]) -> bool:
+        """
+        Check whether cached results answer a search with the given limit.
+        """
+        if cached.get("exhausted") or cached.get("limit") is None:
+            return True
+        return limit is not None and cached["total_products"] >= limit
+
+    async def _probe(self, store: str, search_term: str, user: str, limit: Optional[int],
+                     max_pages: int) -> Tuple[Dict[str, Any], bool]:
+        return await self._admitted_search(store, search_term, user, limit, max_pages), False
+
+    def _budget(self, store: str) -> float:
+        return self.scrapers[store].config.timeouts.get("search_budget", 60000) / 1000
+
+    async def _deduplicated_search(self, store: str, search_term: str, user: str,
+                                   limit: Optional[int]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Scrape a store unless the same search is already running, in which
+        case wait for that search's results to appear in the cache.
+
+        Returns:
+            Tuple of (results, whether this call scraped them)
+        """
+        lock_name = f"scrape:{store}:{normalize_text(search_term)}"
+        # Held at most until the search's deadline; a holder that dies leaves it to expire
+        lock_ttl = self.deadline
+        waited = False
+        while True:
+            token = await self.backend.run(self.backend.acquire_lock, lock_name, ttl=lock_ttl)
+            if token is not None:
+                try:
+                    results = await self._admitted_search(store, search_term, user, limit)
+                    # Cache before releasing the lock so waiters find the results
+                    if results.get("success"):
+                        await self.result_cache.put(store, search_term, results)
+                    return results, True
+                finally:
+                    await self.backend.run(self.backend.release_lock, lock_name, token)
+
+            if not waited:
+                waited = True
+                self._deduplicated += 1
+                logger.info(f"{store} search for '{search_term}' already running, waiting for its results")
+            await asyncio.sleep(self.DEDUP_POLL)
+            cached = await self.result_cache.get(store, search_term, count=False)
+            if cached is not None and self._covers(cached, limit):
+                return cached, False
+
+    async def _admitted_search(self, store: str, search_term: str, user: str,
+                               limit: Optional[int], max_pages: Optional[int] = None) -> Dict[str, Any]:
+        breaker = self.breakers[store]
+        async with self.scheduler.slot(store, user):
+            if not breaker.allow_request():
+                return self._failure(search_term, f"{store} is temporarily unavailable, skipping it for now")
+
+            # The budget starts once admitted: queueing under load is not a store failure
+            budget = self._budget(store)
+            try:
+                results = await asyncio.wait_for(
+                    self._hedged_scrape(store, search_term, user, limit, max_pages), timeout=budget
+                )
+            except asyncio.TimeoutError:
+                breaker.record_failure()
+                logger.warning(f"{store} search for '{search_term}' exceeded its {budget:.0f}s budget")
+                return self._failure(search_term, f"{store} did not respond within {budget:.0f}s")
+            except asyncio.CancelledError:
+                breaker.abandon_request()
+                raise
+            if results.get("success"):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            return results
+
+    async def _hedged_scrape(self, store: str, search_term: str, user: str, limit: Optional[int],
+                             max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Scrape a store, starting a second attempt in another page if the first
+        one is still running after the store's `hedge_after` timeout.
+        The second attempt takes its own scheduler slot, so hedging stays within
+        the per-store limit. The first successful attempt wins and the other one
+        is cancelled.
+        """
+        scraper = self.scrapers[store]
+        hedge_after = scraper.config.timeouts.get("hedge_after", 0) / 1000
+        attempts = [asyncio.create_task(scraper.scrape_products(search_term, limit, max_pages))]
+
+        async def hedge() -> Dict[str, Any]:
+            try:
+                async with self.scheduler.slot(store, user):
+                    return await scraper.scrape_products(search_term, limit, max_pages)
+            except SchedulerBusy as e:
+                return self._failure(search_term, str(e))
+
+        try:
+            if hedge_after:
+                done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+                if not done:
+                    logger.info(f"{store} slow after {hedge_after:.0f}s, hedging '{search_term}' in a second page")
+                    attempts.append(asyncio.create_task(hedge()))
+
+            results = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results = task.result()
+                    if results.get("success"):
+                        return results
+            return results
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return scheduler and circuit breaker metrics.
+        """
+        return {
+            "scheduler": self.scheduler.stats(),
+            "circuit_breakers": {store: breaker.stats() for store, breaker in self.breakers.items()},
+            "result_cache": self.result_cache.stats(),
+            "scrapes": self._scrapes,
+            "pages_per_query": round(self._pages_loaded / self._scrapes, 2) if self._scrapes else 0.0,
+            "deduplicated": self._deduplicated,
+            "refresh_probes": self._probes,
+            "refresh_unchanged": self._unchanged,
+        }
+
+    async def close(self):
+        """
+        Close every store's browser.
+        """
+        for scraper in self.scrapers.values():
+            await scraper.close()
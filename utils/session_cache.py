@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Resource types that are safe to serve from disk between scrapes.
+# Documents and XHR/fetch calls carry search results and must stay live.
+CACHEABLE_RESOURCE_TYPES = {"stylesheet", "script", "font", "image"}
+
+
+class SessionCache:
+    """
+    Persists a store's Playwright storage state (cookies, local storage) and
+    keeps an on-disk cache of static assets shared by every browser context.
+    """
+
+    def __init__(self, store: str, session_config: Dict[str, Any]):
+        """
+        Initialize the session cache for a store.
+
+        Args:
+            store: Store identifier used to namespace files on disk
+            session_config: The `session` section of the scraper config
+        """
+        self.store = store
+        root = Path(session_config.get("cache_root", ".cache")) / store
+        self.storage_state_path = root / "storage_state.json"
+        self.asset_dir = root / "http"
+        self.state_max_age = session_config.get("state_max_age", 86400)
+        self.asset_max_age = session_config.get("asset_max_age", 604800)
+        self.asset_dir.mkdir(parents=True, exist_ok=True)
+
+    def storage_state(self) -> Optional[str]:
+        """
+        Return the storage state path if it exists and has not expired.
+        """
+        if not self.storage_state_path.exists():
+            return None
+        age = time.time() - self.storage_state_path.stat().st_mtime
+        if age > self.state_max_age:
+            logger.info(f"Storage state for {self.store} expired, refreshing")
+            return None
+        return str(self.storage_state_path)
+
+    def needs_refresh(self) -> bool:
+        """
+        Check whether the storage state should be captured again.
+        """
+        return self.storage_state() is None
+
+    async def save_storage_state(self, context) -> None:
+        """
+        Capture the context's storage state to disk.
+        """
+        try:
+            await context.storage_state(path=str(self.storage_state_path))
+            logger.info(f"Saved storage state for {self.store}")
+        except Exception as e:
+            logger.warning(f"Could not save storage state for {self.store}: {e}")
+
+    def invalidate(self) -> None:
+        """
+        Drop the persisted storage state so the next context starts clean.
+        """
+        self.storage_state_path.unlink(missing_ok=True)
+
+    def _asset_paths(self, url: str):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.asset_dir / f"{key}.body", self.asset_dir / f"{key}.json"
+
+    def read_asset(self, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        Return the cached metadata and body of an asset, or None if it is
+        missing, expired or unreadable.
+        """
+        body_path, meta_path = self._asset_paths(url)
+        try:
+            if time.time() - body_path.stat().st_mtime > self.asset_max_age:
+                return None
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return meta, body_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Cached asset unusable for {url}: {e}")
+            return None
+
+    def write_asset(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """
+        Store an asset on disk. The asset cache directory is shared by every
+        scraper process, so each file is written to a temporary file and
+        renamed into place, and the body is in place before its metadata:
+        readers only ever see complete files.
+        """
+        body_path, meta_path = self._asset_paths(url)
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps({"status": status, "headers": headers}).encode("utf-8"))
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    async def handle_route(self, route) -> None:
+        """
+        Playwright route handler serving static assets from disk when possible.
+        Disk reads and writes run in a thread, off the event loop.
+        """
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            await route.continue_()
+            return
+
+        cached = await asyncio.to_thread(self.read_asset, request.url)
+        if cached is not None:
+            meta, body = cached
+            try:
+                await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+                return
+            except Exception as e:
+                logger.debug(f"Cached asset unusable for {request.url}: {e}")
+
+        try:
+            response = await route.fetch()
+        except Exception:
+            await route.continue_()
+            return
+
+        body = await response.body()
+        if response.status == 200:
+            headers = {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+            }
+            try:
+                await asyncio.to_thread(self.write_asset, request.url, response.status, headers, body)
+            except OSError as e:
+                logger.debug(f"Could not cache asset {request.url}: {e}")
+        await route.fulfill(response=response, body=body)
@@ -0,0 +1,41 @@
+import time
+from pathlib import Path
+from typing import Tuple
+
+from utils.normalize import normalize_text
+
+
+def save_snapshot(snapshot_dir: str, store: str, search_term: str, html: str) -> Path:
+    """
+    Save a results page's HTML for later offline re-extraction.
+
+    Args:
+        snapshot_dir: Directory to save into (created if missing)
+        store: Store the page is from (e.g. 'giassi')
+        search_term: Search the page shows results for
+        html: Page HTML
+
+    Returns:
+        Path of the saved file, named '<store>--<term>--<timestamp>.html'
+    """
+    directory = Path(snapshot_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    term = normalize_text(search_term).replace(" ", "-") or "search"
+    now = time.time()
+    timestamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+    path = directory / f"{store}--{term}--{timestamp}.html"
+    path.write_text(html, encoding="utf-8")
+    return path
+
+
+def snapshot_info(path: Path) -> Tuple[str, str]:
+    """
+    Return the (store, normalized search term) a snapshot was saved for.
+
+    Raises:
+        ValueError: If the file name was not produced by save_snapshot
+    """
+    parts = Path(path).stem.split("--")
+    if len(parts) != 3:
+        raise ValueError(f"Not a snapshot file name: {Path(path).name}")
+    return parts[0], parts[1].replace("-", " ")
@@ -0,0 +1,311 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKEND_ENV = "STATE_BACKEND_URL"
+LOCK_PREFIX = "lock:"
+
+
+class LockTimeout(Exception):
+    """
+    Raised when a backend lock could not be acquired in time.
+    """
+
+
+class StateBackend(ABC):
+    """
+    Key-value store for state that every server worker must see: shopping
+    lists, cached search results and in-flight scrape locks.
+
+    Values are JSON-serializable objects. Keys written with a ttl expire on
+    their own, so a worker that dies while holding a lock only blocks others
+    until the lock's ttl runs out.
+    """
+
+    name = "base"
+    shared = False  # True when the state is visible to other processes
+    blocking = False  # True when operations wait on the network
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the value stored under key, or None if missing or expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, optionally expiring after ttl seconds.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove a key if present.
+        """
+
+    @abstractmethod
+    def set_if_absent(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Atomically store a value only if the key does not exist.
+
+        Returns:
+            True if the value was stored
+        """
+
+    @abstractmethod
+    def delete_if_equals(self, key: str, value: Any) -> bool:
+        """
+        Atomically remove a key only if it still holds the given value.
+
+        Returns:
+            True if the key was removed
+        """
+
+    def acquire_lock(self, name: str, ttl: float) -> Optional[str]:
+        """
+        Try once to take a named lock.
+
+        Args:
+            name: Lock name, shared by every worker using this backend
+            ttl: Seconds after which the lock is released even if its holder died
+
+        Returns:
+            A token to release the lock with, or None if someone else holds it
+        """
+        token = uuid.uuid4().hex
+        if self.set_if_absent(LOCK_PREFIX + name, token, ttl):
+            return token
+        return None
+
+    def release_lock(self, name: str, token: str) -> bool:
+        """
+        Release a lock taken with acquire_lock, unless it already expired and
+        was taken by someone else.
+        """
+        return self.delete_if_equals(LOCK_PREFIX + name, token)
+
+    @contextmanager
+    def locked(self, name: str, ttl: float = 10.0, wait: float = 10.0, poll: float = 0.02):
+        """
+        Hold a named lock for a short, synchronous critical section.
+
+        Waiting blocks the calling thread, so async code must enter it from a
+        worker thread (e.g. through asyncio.to_thread).
+
+        Raises:
+            LockTimeout: If the lock is not acquired within wait seconds
+        """
+        deadline = time.monotonic() + wait
+        token = self.acquire_lock(name, ttl)
+        while token is None:
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"Timed out waiting for lock '{name}'")
+            time.sleep(poll)
+            token = self.acquire_lock(name, ttl)
+        try:
+            yield
+        finally:
+            self.release_lock(name, token)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a backend operation from async code without blocking the event
+        loop: in a worker thread for network backends, directly otherwise.
+
+        Args:
+            fn: Bound method of this backend (or a function calling it)
+        """
+        if self.blocking:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    def close(self) -> None:
+        """
+        Release any connections held by the backend.
+        """
+
+
+class InMemoryBackend(StateBackend):
+    """
+    Process-local backend, the default when running a single worker.
+
+    Keys with a ttl are evicted least recently used first once there are more
+    than max_entries of them; keys without a ttl and locks are never evicted
+    (locks only expire), so a held lock cannot be pushed out by cached data.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the backend.
+
+        Args:
+            max_entries: Maximum number of expiring keys kept
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._persistent: Dict[str, Any] = {}
+        self._expiring: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._locks: Dict[str, Tuple[float, Any]] = {}
+
+    def _get(self, key: str) -> Optional[Any]:
+        if key.startswith(LOCK_PREFIX):
+            entry = self._locks.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[0]:
+                del self._locks[key]
+                return None
+            return entry[1]
+        if key in self._persistent:
+            return self._persistent[key]
+        entry = self._expiring.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._expiring[key]
+            return None
+        self._expiring.move_to_end(key)
+        return entry[1]
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if key.startswith(LOCK_PREFIX):
+            self._locks[key] = (time.monotonic() + ttl if ttl is not None else float("inf"), value)
+            return
+        self._persistent.pop(key, None)
+        self._expiring.pop(key, None)
+        if ttl is None:
+            self._persistent[key] = value
+            return
+        self._expiring[key] = (time.monotonic() + ttl, value)
+        while len(self._expiring) > self.max_entries:
+            self._expiring.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def _delete(self, key: str) -> None:
+        self._locks.pop(key, None)
+        self._persistent.pop(key, None)
+        self._expiring.pop(key, None)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._delete(key)
+
+    def set_if_absent(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def delete_if_equals(self, key: str, value: Any) -> bool:
+        with self._lock:
+            if self._get(key) != value:
+                return False
+            self._delete(key)
+            return True
+
+
+class RedisBackend(StateBackend):
+    """
+    Redis-backed state shared by every worker pointed at the same server.
+
+    Requires the optional `redis` package (`uv sync --extra redis`).
+    """
+
+    name = "redis"
+    shared = True
+    blocking = True
+
+    # Compare-and-delete, so a lock is only released by the worker holding it
+    _DELETE_IF_EQUALS = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, prefix: str = "grocery:", client: Any = None):
+        """
+        Initialize the backend.
+
+        Args:
+            url: Redis URL, e.g. 'redis://localhost:6379/0'
+            prefix: Namespace prepended to every key
+            client: Existing redis client to use instead of connecting to url
+        """
+        if client is None:
+            import redis  # optional dependency, only needed for shared deployments
+
+            client = redis.Redis.from_url(
+                url, decode_responses=True, socket_timeout=2.0, socket_connect_timeout=2.0
+            )
+        self.client = client
+        self.prefix = prefix
+        self._delete_if_equals = client.register_script(self._DELETE_IF_EQUALS)
+
+    @staticmethod
+    def _ttl_ms(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl is not None else None
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=self._ttl_ms(ttl))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def set_if_absent(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(
+            self.prefix + key, json.dumps(value, ensure_ascii=False), px=self._ttl_ms(ttl), nx=True
+        ))
+
+    def delete_if_equals(self, key: str, value: Any) -> bool:
+        removed = self._delete_if_equals(keys=[self.prefix + key], args=[json.dumps(value, ensure_ascii=False)])
+        return bool(removed)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def create_backend(url: Optional[str] = None) -> StateBackend:
+    """
+    Build the state backend for a URL, read from the STATE_BACKEND_URL
+    environment variable when not given.
+
+    Args:
+        url: 'memory://' or empty for the in-process backend, 'redis://...' or
+             'rediss://...' for a backend shared between workers
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    url = url if url is not None else os.environ.get(STATE_BACKEND_ENV, "")
+    if not url or url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        logger.info("Using shared Redis state backend")
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported state backend URL: {url}")